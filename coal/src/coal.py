@@ -1,16 +1,151 @@
 # Imports
 
+import asyncio
+import concurrent.futures
 import discord
+import logging
+import logging.handlers
 import os
+import queue
+import random
+import time
+from collections import OrderedDict
 from dotenv import load_dotenv
 import psycopg2
 from discord.ext.commands import Bot
 from mcstatus import JavaServer
 
+log = logging.getLogger('coal')
+
+# fetch_user results kept by resolve_user: how many, and for how long (seconds).
+USER_CACHE_SIZE = 1024
+USER_CACHE_TTL = 3600
+# with_backoff: calls made before a 429 is given up on, and the longest sleep.
+BACKOFF_ATTEMPTS = 6
+BACKOFF_CAP = 30
+
+MODULES = ['utils', 'grave', 'minecraft', 'economy', 'levels', 'tts', 'reminders', 'stats', 'hastebin']
+
 
 class CoalBot(Bot):
     db: psycopg2.extensions.connection
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # psycopg2 blocks for a full round trip to Supabase on every execute and
+        # commit. One dedicated thread keeps that off the event loop. It has a
+        # connection of its own (_thread_db), so its transactions never
+        # interleave with the ones commands run on self.db.
+        self._db_thread = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix='coal-db')
+        self._fetched_users = OrderedDict()  # user_id -> (fetched_at, User)
+
+    def _in_thread_db(self, fn, *args):
+        try:
+            return fn(self._thread_db, *args)
+        except Exception:
+            self._thread_db.rollback()
+            raise
+
+    async def run_db(self, fn, *args):
+        """Run fn(conn, *args) on the database thread with that thread's connection.
+
+        A failed call is rolled back before the exception reaches the caller.
+        """
+        return await asyncio.get_running_loop().run_in_executor(self._db_thread, self._in_thread_db, fn, *args)
+
+    async def resolve_user(self, user_id):
+        """get_user, falling back to a cached fetch_user for users not in the gateway cache."""
+        user = self.get_user(user_id)
+        if user is not None:
+            return user
+        now = time.monotonic()
+        hit = self._fetched_users.get(user_id)
+        if hit is not None and now - hit[0] < USER_CACHE_TTL:
+            self._fetched_users.move_to_end(user_id)
+            return hit[1]
+        user = await self.fetch_user(user_id)
+        self._fetched_users[user_id] = (now, user)
+        self._fetched_users.move_to_end(user_id)
+        if len(self._fetched_users) > USER_CACHE_SIZE:
+            self._fetched_users.popitem(last=False)
+        return user
+
+    async def with_backoff(self, call, attempts=BACKOFF_ATTEMPTS):
+        """Await call(), sleeping and calling again while Discord answers 429."""
+        delay = 1
+        for _ in range(attempts - 1):
+            try:
+                return await call()
+            except discord.HTTPException as e:
+                if e.status != 429:
+                    raise
+            # Doubling delay, capped, with jitter so retries don't line up.
+            await asyncio.sleep(delay + random.random())
+            delay = min(delay * 2, BACKOFF_CAP)
+        return await call()
+
+    async def setup_hook(self):
+        # Runs once before login, unlike on_ready which fires again on every
+        # gateway reconnect.
+        log.info('Connecting to Supabase...')
+        loop = asyncio.get_running_loop()
+        connect = lambda: psycopg2.connect(DATABASE_URL, connect_timeout=10)
+        self.db = await loop.run_in_executor(self._db_thread, connect)
+        self._thread_db = await loop.run_in_executor(self._db_thread, connect)
+        log.info('Connected to Supabase database.')
+        await self.run_db(_init_db)
+        log.info('Tables ensured.')
+
+        # Load modules
+        loaded = 0
+        for module in MODULES:
+            try:
+                await self.load_extension(f'modules.{module}')
+                log.info('Loaded module: %s', module)
+                loaded += 1
+            except Exception as e:
+                log.error('Failed to load module %s: %s', module, e)
+        if loaded == 0:
+            log.warning('No modules loaded.')
+        elif loaded == len(MODULES):
+            log.info('All modules loaded.')
+        else:
+            log.info('Loaded %s out of %s modules.', loaded, len(MODULES))
+
+        log.info('All databases loaded. All Modules loaded. Ready to go!')
+
+    async def close(self):
+        await super().close()
+        loop = asyncio.get_running_loop()
+        for conn in (getattr(self, 'db', None), getattr(self, '_thread_db', None)):
+            if conn is not None:
+                await loop.run_in_executor(self._db_thread, conn.close)
+        self._db_thread.shutdown(wait=False)
+
+
+def _init_db(db):
+    c = db.cursor()
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS death_log (
+            log_id  SERIAL PRIMARY KEY,
+            id      TEXT,
+            cntr    INTEGER,
+            reason  TEXT
+        )
+    ''')
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS balances (
+            user_id    BIGINT PRIMARY KEY,
+            balance    INTEGER DEFAULT 1000,
+            last_daily TEXT DEFAULT NULL,
+            last_work  TEXT DEFAULT NULL
+        )
+    ''')
+    # The wealth leaderboard reads the top balances in order and stops.
+    c.execute('CREATE INDEX IF NOT EXISTS idx_balances_balance ON balances (balance DESC)')
+    db.commit()
+    c.close()
+
 
 # Bot Intents
 
@@ -35,70 +170,31 @@ bot = CoalBot(command_prefix='-' or '!' or '?', intents=intents, help_command=No
 
 @bot.event
 async def on_ready():
-    print(f'{bot.user} has connected to Discord!')
-    print(f'Monitoring Minecraft server: {MINECRAFT_SERVER_IP}')
-
-    # Load modules
-    modules = ['utils', 'grave', 'minecraft', 'economy', 'levels', 'tts', 'reminders', 'stats', 'hastebin']
-    loaded = 0
-    for module in modules:
-        try:
-            mod = __import__(f'modules.{module}', fromlist=['setup'])
-            mod.setup(bot)
-            print(f'Loaded module: {module}')
-            loaded += 1
-        except Exception as e:
-            print(f'Failed to load module {module}: {e}')
-    if loaded == 0:
-        print('No modules loaded.')
-    elif loaded == len(modules):
-        print('All modules loaded.')
-    else:
-        print(f'Loaded {loaded} out of {len(modules)} modules.')
-
-    print(f'All databases loaded. All Modules loaded. Ready to go!')
+    log.info('%s has connected to Discord!', bot.user)
+    log.info('Monitoring Minecraft server: %s', MINECRAFT_SERVER_IP)
 
 # Run the bot
 
 if __name__ == '__main__':
     if not TOKEN or not MINECRAFT_SERVER_IP or not DATABASE_URL:
-        print("Error: DISCORD_TOKEN, MINECRAFT_SERVER_IP, or DATABASE_URL is not set. Please check your environment variables.")
+        log.error("DISCORD_TOKEN, MINECRAFT_SERVER_IP, or DATABASE_URL is not set. Please check your environment variables.")
     else:
+        # discord.py installs the handler on the root logger. It only queues
+        # records; the listener thread writes them, so a slow stdout pipe
+        # can't stall the bot.
+        log_queue = queue.SimpleQueue()
+        log_listener = logging.handlers.QueueListener(log_queue, logging.StreamHandler())
+        log_listener.start()
         try:
-            # Connect to DB before starting the event loop so the blocking
-            # network call does not freeze the Discord heartbeat.
-            print('Connecting to Supabase...')
-            bot.db = psycopg2.connect(DATABASE_URL, connect_timeout=10)
-            print('Connected to Supabase database.')
-
-            c = bot.db.cursor()
-            c.execute('''
-                CREATE TABLE IF NOT EXISTS death_log (
-                    log_id  SERIAL PRIMARY KEY,
-                    id      TEXT,
-                    cntr    INTEGER,
-                    reason  TEXT
-                )
-            ''')
-            c.execute('''
-                CREATE TABLE IF NOT EXISTS balances (
-                    user_id    BIGINT PRIMARY KEY,
-                    balance    INTEGER DEFAULT 1000,
-                    last_daily TEXT DEFAULT NULL,
-                    last_work  TEXT DEFAULT NULL
-                )
-            ''')
-            bot.db.commit()
-            c.close()
-            print('Tables ensured.')
-
-            bot.run(TOKEN)
+            bot.run(TOKEN, log_handler=logging.handlers.QueueHandler(log_queue), root_logger=True)
         except psycopg2.OperationalError as e:
-            print(f"Error: Could not connect to database: {e}")
+            log.error("Could not connect to database: %s", e)
         except discord.errors.LoginFailure:
-            print("Error: Improper token has been passed. Please check your DISCORD_TOKEN.")
+            log.error("Improper token has been passed. Please check your DISCORD_TOKEN.")
         except KeyboardInterrupt:
-            print("Bot stopped by user.")
+            log.info("Bot stopped by user.")
         except Exception as e:
-            print(f"An unexpected error occurred during bot execution: {e}")
+            log.error("An unexpected error occurred during bot execution: %s", e)
+        finally:
+            log_listener.stop()
 
@@ -1,13 +1,21 @@
 """Economy commands module"""
 
+import asyncio
+import logging
 import random
+from collections import Counter
 import discord
 from discord import user
 from discord.ext import commands
 import psycopg2  # type: ignore[import-untyped]
 
+log = logging.getLogger(__name__)
 
-def setup(bot):
+_DICE_FACES = (1, 2, 3, 4, 5, 6)
+_SLOT_SYMBOLS = ('⭐', '🍒', '🍋', '🍊', '🍉', '7️⃣', '💰', '💎', '💵')
+
+
+async def setup(bot):
     """Setup function to register commands with the bot"""
 
     @bot.command()
@@ -30,7 +38,7 @@ def setup(bot):
 
         except psycopg2.Error as e:
             await ctx.send(f'Error accessing balance: {e}')
-            print(f'Database error in balance command: {e}')
+            log.error('Database error in balance command: %s', e)
 
     @bot.command(alias = 'bal')
     async def daily(ctx):
@@ -83,12 +91,12 @@ def setup(bot):
                 color=discord.Color.gold()
             )
 
-            for i, (user_id, balance) in enumerate(results, 1):
-                try:
-                    user = await bot.fetch_user(user_id)
-                    username = user.name
-                except:
-                    username = f"User {user_id}"
+            # Resolve all ten names concurrently rather than one round trip at a time.
+            users = await asyncio.gather(
+                *(bot.resolve_user(user_id) for user_id, _ in results), return_exceptions=True
+            )
+            for i, ((user_id, balance), user) in enumerate(zip(results, users), 1):
+                username = f"User {user_id}" if isinstance(user, BaseException) else user.name
 
                 medal = "🥇" if i == 1 else "🥈" if i == 2 else "🥉" if i == 3 else f"{i}."
                 embed.add_field(
@@ -102,7 +110,7 @@ def setup(bot):
 
         except psycopg2.Error as e:
             await ctx.send(f"Error accessing leaderboard: {e}")
-            print(f"Database error in richest command: {e}")
+            log.error("Database error in richest command: %s", e)
 
     @bot.command()
     async def give(ctx, user: discord.Member, amount: int):
@@ -145,101 +153,110 @@ def setup(bot):
 
         except psycopg2.Error as e:
             await ctx.send(f"Error processing transaction: {e}")
-            print(f"Database error in give command: {e}")
+            log.error("Database error in give command: %s", e)
+
+    def _settle_bet(db, user_id, bet, delta):
+        """Apply a bet's net result in one statement and one commit.
+
+        Runs on the database thread via bot.run_db. Returns (settled,
+        new_account). A first-time player is opened at 1,000 coins by the same
+        statement; their bet only goes through if that starting balance covers it.
+        """
+        c = db.cursor()
+        c.execute(
+            "INSERT INTO balances (user_id, balance) "
+            "VALUES (%s, CASE WHEN %s <= 1000 THEN 1000 + %s ELSE 1000 END) "
+            "ON CONFLICT (user_id) DO UPDATE SET balance = balances.balance + %s "
+            "WHERE balances.balance >= %s "
+            "RETURNING xmax = 0",
+            (user_id, bet, delta, delta, bet),
+        )
+        row = c.fetchone()
+        db.commit()
+        if row is None:
+            return False, False
+        new_account = row[0]
+        return not (new_account and bet > 1000), new_account
+
+    def _slot_payout(result):
+        """Return (multiplier, message) for three slot symbols; 0 means the bet is lost."""
+        counts = Counter(result)
+        stars = counts['⭐']
+        # Three symbols: one distinct value is a triple, at most two means a pair.
+        triple = len(counts) == 1
+        pair = len(counts) <= 2
+        if stars == 3:
+            # jackpot
+            return 100, "You got a JACKPOT! You won {} coins!"
+        if stars == 0 and triple:
+            # All three symbols are the same and NOT stars
+            return 50, "Congratulations! You won {} coins!"
+        if stars == 1 and pair:
+            # Two symbols are the same and one is a star
+            return 10, "You got a match with a wild! You won {} coins!"
+        if stars == 2:
+            # 2 symbols are stars and the third does not matter
+            return 5, "You got two stars! You won {} coins!"
+        if stars == 1:
+            # One symbol is a star the other 2 are NOT the same
+            return 3, "You got a star! You won {} coins!"
+        if pair:
+            # Two symbols are the same
+            return 2, "You got a double! You won {} coins!"
+        return 0, "Sorry, you lost {} coins."
 
     @bot.command()
-    async def coinflip(ctx, flip, bet=100):
+    async def coinflip(ctx, flip, bet: int = 100):
         '''Flips a coin and returns the result.'''
-        user_id = ctx.author.id
-        c = bot.db.cursor()
-        c.execute('SELECT balance FROM balances WHERE user_id = %s', (user_id,))
-        result = c.fetchone()
+        if bet <= 0:
+            await ctx.send("Please enter a positive amount to bet.")
+            return
+        result = random.choice(['heads', 'tails'])
+        won = flip.lower() == result
 
-        if not result:
-            c.execute('INSERT INTO balances (user_id, balance) VALUES (%s, %s)', (user_id, 1000))
-            bot.db.commit()
-            balance = 1000
+        settled, new_account = await bot.run_db(_settle_bet, ctx.author.id, bet, bet if won else -bet)
+        if new_account:
             await ctx.send("Have you been here before%s I'll give you a starting balance of 1,000 coins.")
-        else:
-            balance = result[0]
-
-        if balance < bet:
+        if not settled:
             await ctx.send("You don't have enough coins for this bet!")
             return
 
-        # Remove bet amount first
-        c.execute('UPDATE balances SET balance = balance - %s WHERE user_id = %s', (bet, user_id))
-        bot.db.commit()
-
-        result = random.choice(['heads', 'tails'])
-        if flip.lower() == result:
-            # Add winnings if won
-            c.execute('UPDATE balances SET balance = balance + %s WHERE user_id = %s', (bet * 2, user_id))
+        if won:
             await ctx.send(f"The coin landed on: **{result}**\nYou won {bet} coins!")
         else:
             await ctx.send(f"The coin landed on: **{result}**\nYou lost {bet} coins!")
-        bot.db.commit()
 
     @bot.command()
-    async def roll(ctx, number_of_dice: int = 1, bet=100):
+    async def roll(ctx, number_of_dice: int = 1, bet: int = 100):
         '''Rolls a dice with a specified number of sides.'''
-        user_id = ctx.author.id
-        c = bot.db.cursor()
-        c.execute('SELECT balance FROM balances WHERE user_id = %s', (user_id,))
-        result = c.fetchone()
-
-        if not result:
-            c.execute('INSERT INTO balances (user_id, balance) VALUES (%s, %s)', (user_id, 1000))
-            bot.db.commit()
-            balance = 1000
-            await ctx.send("Have you been here before%s I'll give you a starting balance of 1,000 coins.")
-        else:
-            balance = result[0]
-
-        if balance < bet:
-            await ctx.send("You don't have enough coins for this bet!")
-            return
-
         if number_of_dice > 100:
             await ctx.send("Sorry, I can't roll that many dice.")
             return
+        if bet <= 0:
+            await ctx.send("Please enter a positive amount to bet.")
+            return
 
-        # Remove bet amount first
-        c.execute('UPDATE balances SET balance = balance - %s WHERE user_id = %s', (bet, user_id))
-        bot.db.commit()
-
-        rolls = [random.randint(1, 6) for _ in range(number_of_dice)]
+        rolls = random.choices(_DICE_FACES, k=number_of_dice)
+        total = sum(rolls)
         result = number_of_dice * random.randint(1, 4)
-        if sum(rolls) >= result:
-            # Add winnings if won
-            c.execute('UPDATE balances SET balance = balance + %s WHERE user_id = %s', (bet * 6, user_id))
+        won = total >= result
+
+        settled, new_account = await bot.run_db(_settle_bet, ctx.author.id, bet, bet * 5 if won else -bet)
+        if new_account:
+            await ctx.send("Have you been here before%s I'll give you a starting balance of 1,000 coins.")
+        if not settled:
+            await ctx.send("You don't have enough coins for this bet!")
+            return
+
+        if won:
             await ctx.send(f"Congratulations! You won {bet * 5} coins!")
         else:
             await ctx.send(
-                f"You rolled {rolls} which has a sum of {sum(rolls)} which does not meet the score {result} and lost {bet} coins.")
-        bot.db.commit()
+                f"You rolled {rolls} which has a sum of {total} which does not meet the score {result} and lost {bet} coins.")
 
     @bot.command()
     async def slots(ctx, bet: int = 100):
         '''Rolls a slot machine with a specified number of dice.'''
-        # Get user's balance
-        user_id = ctx.author.id
-        c = bot.db.cursor()
-        c.execute('SELECT balance FROM balances WHERE user_id = %s', (user_id,))
-        result = c.fetchone()
-
-        if not result:
-            c.execute('INSERT INTO balances (user_id, balance) VALUES (%s, %s)', (user_id, 1000))
-            bot.db.commit()
-            balance = 1000
-            await ctx.send("Have you been here before%s I'll give you a starting balance of 1,000 coins.")
-        else:
-            balance = result[0]
-
-        if balance < bet:
-            await ctx.send("You don't have enough coins for this bet!")
-            return
-
         if bet <= 0:
             await ctx.send("Please enter a positive amount to bet.")
             return
@@ -247,52 +264,19 @@ def setup(bot):
             await ctx.send("Sorry, I can't bet that much.")
             return
 
-        # Remove bet amount first
-        c.execute('UPDATE balances SET balance = balance - %s WHERE user_id = %s', (bet, user_id))
-        bot.db.commit()
+        result = random.choices(_SLOT_SYMBOLS, k=3)
+        multiplier, outcome = _slot_payout(result)
+        winnings = bet * multiplier
 
-        symbols = ['⭐', '🍒', '🍋', '🍊', '🍉', '7️⃣', '💰', '💎', '💵']
-        result = []
-        for _ in range(3):
-            symbols_copy = symbols.copy()
-            random.shuffle(symbols_copy)
-            result.append(symbols_copy[0])
-        await ctx.send(f"🎰 Slot machine result: {' | '.join(result)}")
+        settled, new_account = await bot.run_db(_settle_bet, ctx.author.id, bet, winnings or -bet)
+        if new_account:
+            await ctx.send("Have you been here before%s I'll give you a starting balance of 1,000 coins.")
+        if not settled:
+            await ctx.send("You don't have enough coins for this bet!")
+            return
 
-        if result.count('⭐') == 3:
-            # jackpot
-            winnings = bet * 100
-            c.execute('UPDATE balances SET balance = balance + %s WHERE user_id = %s', (winnings + bet, user_id))
-            await ctx.send(f"You got a JACKPOT! You won {winnings} coins!")
-        elif result.count('⭐') == 0 and result[0] == result[1] == result[2]:
-            # All three symbols are the same and NOT stars
-            winnings = bet * 50
-            c.execute('UPDATE balances SET balance = balance + %s WHERE user_id = %s', (winnings + bet, user_id))
-            await ctx.send(f"Congratulations! You won {winnings} coins!")
-        elif result.count('⭐') == 1 and (result[0] == result[1] or result[1] == result[2] or result[0] == result[2]):
-            # Two symbols are the same and one is a star
-            winnings = bet * 10
-            c.execute('UPDATE balances SET balance = balance + %s WHERE user_id = %s', (winnings + bet, user_id))
-            await ctx.send(f"You got a match with a wild! You won {winnings} coins!")
-        elif result.count('⭐') == 2 and len(set(result)) == 2:
-            # 2 symbols are stars and the third does not matter
-            winnings = bet * 5
-            c.execute('UPDATE balances SET balance = balance + %s WHERE user_id = %s', (winnings + bet, user_id))
-            await ctx.send(f"You got two stars! You won {winnings} coins!")
-        elif result.count('⭐') == 1 and not (
-                result[0] == result[1] or result[1] == result[2] or result[0] == result[2]):
-            # One symbol is a star the other 2 are NOT the same
-            winnings = bet * 3
-            c.execute('UPDATE balances SET balance = balance + %s WHERE user_id = %s', (winnings + bet, user_id))
-            await ctx.send(f"You got a star! You won {winnings} coins!")
-        elif result[0] == result[1] or result[1] == result[2] or result[0] == result[2]:
-            # Two symbols are the same
-            winnings = bet * 2
-            c.execute('UPDATE balances SET balance = balance + %s WHERE user_id = %s', (winnings + bet, user_id))
-            await ctx.send(f"You got a double! You won {winnings} coins!")
-        else:
-            await ctx.send(f"Sorry, you lost {bet} coins.")
-        bot.db.commit()
+        await ctx.send(f"🎰 Slot machine result: {' | '.join(result)}")
+        await ctx.send(outcome.format(winnings or bet))
 
     @bot.command()
     async def work(ctx):
@@ -375,7 +359,7 @@ def setup(bot):
 
         except psycopg2.Error as e:
             await ctx.send(f"Error processing transaction: {e}")
-            print(f"Database error in a_give command: {e}")
+            log.error("Database error in a_give command: %s", e)
 
 
     @bot.command()
@@ -406,7 +390,7 @@ def setup(bot):
 
         except psycopg2.Error as e:
             await ctx.send(f"Error processing transaction: {e}")
-            print(f"Database error in a_take command: {e}")
+            log.error("Database error in a_take command: %s", e)
 
     @bot.command()
     async def rob(ctx, user_id: int):
@@ -436,74 +420,20 @@ def setup(bot):
     async def scratch(ctx, bet: int = 100):
         '''Scratch another user of a random amount of coins.'''
         '''Rolls a slot machine with a specified number of dice.'''
-        # Get user's balance
-        user_id = ctx.author.id
-        c = bot.db.cursor()
-        c.execute('SELECT balance FROM balances WHERE user_id = %s', (user_id,))
-        result = c.fetchone()
-
-        if not result:
-            c.execute('INSERT INTO balances (user_id, balance) VALUES (%s, %s)', (user_id, 1000))
-            bot.db.commit()
-            balance = 1000
-            await ctx.send("Have you been here before%s I'll give you a starting balance of 1,000 coins.")
-        else:
-            balance = result[0]
-
-        if balance < bet:
-            await ctx.send("You don't have enough coins for this bet!")
-            return
-
         if bet <= 0:
             await ctx.send("Please enter a positive amount to bet.")
             return
 
-        # Remove bet amount first
-        c.execute('UPDATE balances SET balance = balance - %s WHERE user_id = %s', (bet, user_id))
-        bot.db.commit()
-
-        symbols = ['⭐', '🍒', '🍋', '🍊', '🍉', '7️⃣', '💰', '💎', '💵']
-        result = []
-        for _ in range(3):
-            symbols_copy = symbols.copy()
-            random.shuffle(symbols_copy)
-            result.append(f"||{symbols_copy[0]}||")
-        await ctx.send(f"🎟️Scratch Off {' | '.join(result)} for {bet} coins!")
-
-        if result.count('⭐') == 3:
-            # jackpot
-            winnings = bet * 100
-            c.execute('UPDATE balances SET balance = balance + %s WHERE user_id = %s', (winnings + bet, user_id))
-            await ctx.send(f"||You got a JACKPOT! You won {winnings} coins!||")
-        elif result.count('⭐') == 0 and result[0] == result[1] == result[2]:
-            # All three symbols are the same and NOT stars
-            winnings = bet * 50
-            c.execute('UPDATE balances SET balance = balance + %s WHERE user_id = %s', (winnings + bet, user_id))
-            await ctx.send(f"||Congratulations! You won {winnings} coins!||")
-        elif result.count('⭐') == 1 and (result[0] == result[1] or result[1] == result[2] or result[0] == result[2]):
-            # Two symbols are the same and one is a star
-            winnings = bet * 10
-            c.execute('UPDATE balances SET balance = balance + %s WHERE user_id = %s', (winnings + bet, user_id))
-            await ctx.send(f"||You got a match with a wild! You won {winnings} coins!||")
-        elif result.count('⭐') == 2 and len(set(result)) == 2:
-            # 2 symbols are stars and the third does not matter
-            winnings = bet * 5
-            c.execute('UPDATE balances SET balance = balance + %s WHERE user_id = %s', (winnings + bet, user_id))
-            await ctx.send(f"||You got two stars! You won {winnings} coins!||")
-        elif result.count('⭐') == 1 and not (
-                result[0] == result[1] or result[1] == result[2] or result[0] == result[2]):
-            # One symbol is a star the other 2 are NOT the same
-            winnings = bet * 3
-            c.execute('UPDATE balances SET balance = balance + %s WHERE user_id = %s', (winnings + bet, user_id))
-            await ctx.send(f"||You got a star! You won {winnings} coins!||")
-        elif result[0] == result[1] or result[1] == result[2] or result[0] == result[2]:
-            # Two symbols are the same
-            winnings = bet * 2
-            c.execute('UPDATE balances SET balance = balance + %s WHERE user_id = %s', (winnings + bet, user_id))
-            await ctx.send(f"||You got a double! You won {winnings} coins!||")
-        else:
-            await ctx.send(f"||Sorry, you lost {bet} coins.||")
-        bot.db.commit()
-
+        result = [f"||{symbol}||" for symbol in random.choices(_SLOT_SYMBOLS, k=3)]
+        multiplier, outcome = _slot_payout(result)
+        winnings = bet * multiplier
 
+        settled, new_account = await bot.run_db(_settle_bet, ctx.author.id, bet, winnings or -bet)
+        if new_account:
+            await ctx.send("Have you been here before%s I'll give you a starting balance of 1,000 coins.")
+        if not settled:
+            await ctx.send("You don't have enough coins for this bet!")
+            return
 
+        await ctx.send(f"🎟️Scratch Off {' | '.join(result)} for {bet} coins!")
+        await ctx.send(f"||{outcome.format(winnings or bet)}||")
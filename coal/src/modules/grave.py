@@ -2,15 +2,24 @@
 
 Stateless: the graveyard channel itself is the source of truth. Every death is
 a bot message of the form ``💀 **Death #N** … <@id> … Reason: …``. The death
-count and obituaries are parsed from channel history on demand, so no database
-is used here. (The legacy ``death_log`` table is left in place but unused.)
+count and obituaries are parsed from channel history (read once, then kept up
+to date in memory), so no database is used here. (The legacy ``death_log``
+table is left in place but unused.)
 """
 
+import asyncio
+import bisect
+import heapq
 import io
+import logging
+import operator
 import re
+from collections import defaultdict
 
 import discord
 
+log = logging.getLogger(__name__)
+
 
 # Channel that holds the death messages (the graveyard).
 DEATH_CHANNEL_ID = 1422284082955685888
@@ -19,13 +28,41 @@ DEATH_CHANNEL_ID = 1422284082955685888
 _DEATH_RE = re.compile(r"Death #(\d+)")
 _MENTION_RE = re.compile(r"<@!?(\d+)>")
 _REASON_RE = re.compile(r"Reason:\s*(.+)", re.DOTALL)
-
-
-def setup(bot):
+_NON_DIGIT = re.compile(r"\D")
+
+# Discord caps a field value at 1024 characters and a whole embed at 6000, so
+# long death lists go into at most this many fields of whole lines.
+FIELD_CHARS = 1024
+MAX_FIELDS = 5
+
+
+def _death_fields(entries):
+    """Split (num, line) pairs into (name, value) fields, keeping the newest."""
+    fields, chunk, size = [], [], 0
+    for num, line in entries:
+        line = line[:FIELD_CHARS]
+        if chunk and size + len(line) > FIELD_CHARS:
+            fields.append(chunk)
+            chunk, size = [], 0
+        chunk.append((num, line))
+        size += len(line) + 1
+    if chunk:
+        fields.append(chunk)
+    return [(f"#{c[0][0]} – #{c[-1][0]}", "\n".join(line for _, line in c))
+            for c in fields[-MAX_FIELDS:]]
+
+
+async def setup(bot):
     """Setup function to register commands with the bot"""
 
+    # Looked up until the guild cache has it, then kept.
+    cached_channel = None
+
     def _channel():
-        return bot.get_channel(DEATH_CHANNEL_ID)
+        nonlocal cached_channel
+        if cached_channel is None:
+            cached_channel = bot.get_channel(DEATH_CHANNEL_ID)
+        return cached_channel
 
     def _parse_death(message):
         """Return (num, user_id, reason) for a bot death message, else None.
@@ -68,15 +105,49 @@ def setup(bot):
             return num + 1
         return 1
 
-    def _parse_target(ctx, args):
-        """Resolve the target id from args: '0', digits, mention, or invoker."""
-        if not args:
-            return str(ctx.author.id)
-        first = args[0]
-        if first == "0" or first.startswith("<@") or first.isdigit():
-            digits = "".join(ch for ch in first if ch.isdigit())
-            return digits if digits else ("0" if first == "0" else str(ctx.author.id))
-        return str(ctx.author.id)
+    # The channel is only read for the first death after startup; later
+    # numbers come from this counter. The lock covers that first read.
+    next_num = None
+    num_lock = asyncio.Lock()
+
+    async def _claim_death_number(channel):
+        nonlocal next_num
+        async with num_lock:
+            if next_num is None:
+                next_num = await _next_death_number(channel)
+            num = next_num
+            next_num += 1
+            return num
+
+    # user_id -> [(num, reason), ...] in death order. Built from the channel by
+    # the first obit after startup, then kept current by death.
+    deaths_by_user = None
+    index_lock = asyncio.Lock()
+
+    async def _death_index(channel):
+        nonlocal deaths_by_user
+        async with index_lock:
+            if deaths_by_user is None:
+                index = defaultdict(list)
+                async for num, uid, reason in _iter_deaths(channel):
+                    index[uid].append((num, reason))
+                for rows in index.values():
+                    rows.reverse()  # history is newest first
+                deaths_by_user = index
+        return deaths_by_user
+
+    def _split_target(ctx, args):
+        """Split args into (target id, remaining words).
+
+        The target is taken from the first arg when it is '0', digits or a
+        mention; otherwise it is the invoker and every arg is left as reason.
+        A mention with no digits in it gives an empty id.
+        """
+        if args:
+            first = args[0]
+            if first == "0" or first.startswith("<@") or first.isdigit():
+                return _NON_DIGIT.sub("", first), args[1:]
+        return str(ctx.author.id), args
 
     @bot.command(name="death", aliases=["die", "d"])
     async def death(ctx, *args):
@@ -90,38 +161,40 @@ def setup(bot):
             return
 
         # Determine target user id and reason.
-        if not args:
-            final_user_id = str(ctx.author.id)
-            reason = None
-        else:
-            first = args[0]
-            if first == "0" or first.startswith("<@") or first.isdigit():
-                final_user_id = _parse_target(ctx, args)
-                reason = " ".join(word.strip(".,!%;:'\"") for word in args[1:]) if len(args) > 1 else None
-            else:
-                final_user_id = str(ctx.author.id)
-                reason = " ".join(word.strip(".,!%;:'\"") for word in args)
+        final_user_id, words = _split_target(ctx, args)
+        final_user_id = final_user_id or str(ctx.author.id)
+        reason = " ".join(word.strip(".,!%;:'\"") for word in words) if words else None
 
         # Next sequential number is derived from the channel, not a database.
         try:
-            num = await _next_death_number(death_channel)
+            num = await _claim_death_number(death_channel)
         except discord.Forbidden:
             await ctx.send("Error: I need permission to read the graveyard's message history.")
             return
 
         # Notify channel / user.
         if final_user_id == "0":
-            await death_channel.send(f'💀 **Death #{num}** - Anonymous\nReason: {reason or "Unknown cause."}')
-            await ctx.send("A new soul has entered the graveyard anonymously.")
-            print("Death logged and posted.")
+            public_msg = f'💀 **Death #{num}** - Anonymous\nReason: {reason or "Unknown cause."}'
+            reply = "A new soul has entered the graveyard anonymously."
         else:
-            mention = f"<@{final_user_id}>"
+            public_msg = f"💀 **Death #{num}** - You have met a terrible fate, <@{final_user_id}>."
             if reason:
-                await death_channel.send(
-                    f"💀 **Death #{num}** - You have met a terrible fate, {mention}.\nReason: {reason}")
-            else:
-                await death_channel.send(f"💀 **Death #{num}** - You have met a terrible fate, {mention}.")
-            await ctx.send("A new soul has entered the graveyard.")
+                public_msg += f"\nReason: {reason}"
+            reply = "A new soul has entered the graveyard."
+        # The two sends don't depend on each other, so issue them together.
+        await asyncio.gather(death_channel.send(public_msg), ctx.send(reply))
+        # Same reason the graveyard message would parse back to.
+        logged_reason = (reason or "Unknown cause.") if final_user_id == "0" else (reason or None)
+        # Under the lock so a death posted while the index is being built is
+        # added once the build finishes instead of being missed.
+        async with index_lock:
+            if deaths_by_user is not None:
+                rows = deaths_by_user[final_user_id]
+                # The build may already have read this death back from the channel.
+                if all(n != num for n, _ in rows):
+                    bisect.insort(rows, (num, logged_reason))
+        if final_user_id == "0":
+            log.info("Death logged and posted.")
 
     @bot.command()
     async def kill(ctx, *args):
@@ -142,22 +215,9 @@ def setup(bot):
             await ctx.send(f"Error: Death channel with ID {DEATH_CHANNEL_ID} not found.")
             return
 
-        if not args:
-            user_id_str = str(ctx.author.id)
-            reason = None
-        else:
-            first = args[0]
-            if first == "0" or first.startswith("<@") or first.isdigit():
-                user_id_str = first
-                reason = " ".join(args[1:]) if len(args) > 1 else None
-            else:
-                user_id_str = str(ctx.author.id)
-                reason = " ".join(args)
-
-        digits = "".join(ch for ch in user_id_str if ch.isdigit())
-        if digits:
-            target_id_for_query = digits
-        else:
+        target_id_for_query, words = _split_target(ctx, args)
+        reason = " ".join(words) if words else None
+        if not target_id_for_query:
             await ctx.send("Invalid user ID provided for revival.")
             return
 
@@ -192,56 +252,67 @@ def setup(bot):
         if user_id in ("-1", "0"):
             target_id_for_query = user_id
         else:
-            digits = "".join(ch for ch in user_id if ch.isdigit())
+            digits = _NON_DIGIT.sub("", user_id)
             target_id_for_query = digits if digits else user_id
 
         try:
-            # Special case: Entire Log (-1)
-            if target_id_for_query == "-1":
-                entries = [(num, uid, reason) async for (num, uid, reason) in _iter_deaths(death_channel)]
-                if not entries:
-                    await ctx.send("No death logs found. (The graveyard is empty.)")
-                    return
-                entries.sort(key=lambda e: e[0])  # by death number, ascending
-                lines = [f'[{num}] User ID: {uid or "Unknown"} | Reason: {reason or "No reason"}'
-                         for num, uid, reason in entries]
-                fp = io.BytesIO("\n".join(lines).encode("utf-8"))
-                await ctx.send("Here is the full death log.", file=discord.File(fp, filename="death_log.txt"))
-                return
+            index = await _death_index(death_channel)
+        except discord.Forbidden:
+            await ctx.send("Error: I need permission to read the graveyard's message history.")
+            return
 
-            # Special case: Anonymous Logs (0)
-            if target_id_for_query == "0":
-                rows = [(num, reason) async for (num, uid, reason) in _iter_deaths(death_channel) if uid == "0"]
-                if not rows:
-                    await ctx.send("No anonymous death logs found.")
-                    return
-                rows.sort(key=lambda r: r[0])
-                lines = [f'**{num}** - {reason or "No reason"}' for num, reason in rows]
-                msg = discord.Embed(
-                    title="💀 Anonymous Death Logs (ID 0)",
-                    description="\n".join(lines),
-                    color=discord.Color.dark_red(),
-                )
-                msg.set_footer(text=f"Total Anonymous Deaths: {len(rows)}")
-                await ctx.send(embed=msg)
+        # Special case: Entire Log (-1)
+        if target_id_for_query == "-1":
+            def _tagged(uid, rows):
+                for num, reason in rows:
+                    yield num, uid, reason
+
+            # Each user's list is already ascending, so merging them yields the
+            # whole log in death order; lines are encoded into the buffer as
+            # they come instead of being collected and joined.
+            fp = io.BytesIO()
+            # Merged on the number alone: uid and reason can be None, and
+            # duplicate numbers in the channel would otherwise compare them.
+            merged = heapq.merge(*(_tagged(uid, rows) for uid, rows in index.items()),
+                                 key=operator.itemgetter(0))
+            for num, uid, reason in merged:
+                if fp.tell():
+                    fp.write(b"\n")
+                fp.write(f'[{num}] User ID: {uid or "Unknown"} | Reason: {reason or "No reason"}'.encode("utf-8"))
+            if not fp.tell():
+                await ctx.send("No death logs found. (The graveyard is empty.)")
                 return
+            fp.seek(0)
+            await ctx.send("Here is the full death log.", file=discord.File(fp, filename="death_log.txt"))
+            return
 
-            # Regular User Lookup
-            rows = [(num, reason) async for (num, uid, reason) in _iter_deaths(death_channel)
-                    if uid == target_id_for_query]
-        except discord.Forbidden:
-            await ctx.send("Error: I need permission to read the graveyard's message history.")
+        # Special case: Anonymous Logs (0)
+        if target_id_for_query == "0":
+            rows = index.get("0")
+            if not rows:
+                await ctx.send("No anonymous death logs found.")
+                return
+            msg = discord.Embed(
+                title="💀 Anonymous Death Logs (ID 0)",
+                color=discord.Color.dark_red(),
+            )
+            for name, value in _death_fields((num, f'**{num}** - {reason or "No reason"}') for num, reason in rows):
+                msg.add_field(name=name, value=value, inline=False)
+            msg.set_footer(text=f"Total Anonymous Deaths: {len(rows)}")
+            await bot.with_backoff(lambda: ctx.send(embed=msg))
             return
 
+        # Regular User Lookup
+        rows = index.get(target_id_for_query)
+
         if rows:
             user_logs_count = len(rows)
-            rows.sort(key=lambda r: r[0])  # oldest first for display
             recent_rows = rows[-10:]  # most recent 10 by number
             desc_lines = [f'**{num}** - {reason or "Rest In Peace :("}' for num, reason in recent_rows]
             # Resolve a nice username for the embed title.
             title_user = target_id_for_query
             try:
-                fetched = await bot.fetch_user(int(target_id_for_query))
+                fetched = await bot.resolve_user(int(target_id_for_query))
                 title_user = str(fetched)
             except Exception:
                 pass
@@ -253,7 +324,7 @@ def setup(bot):
             )
             msg.set_footer(
                 text=f"Total deaths: {user_logs_count}.\n Showing last {len(recent_rows)} entries. | May they rest in peace.")
-            await ctx.send(embed=msg)
+            await bot.with_backoff(lambda: ctx.send(embed=msg))
 
             if user_logs_count >= 100:
                 await ctx.send("Holy smokes, that is a lot of deaths... you might want to stop dying! 🤯")
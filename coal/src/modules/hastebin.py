@@ -6,7 +6,7 @@ import discord
 HASTE_URL = 'https://haste.zneix.eu'
 
 
-def setup(bot):
+async def setup(bot):
     """Setup function to register commands with the bot"""
 
     @bot.command(name='haste', aliases=['hastebin', 'paste', 'pb'])
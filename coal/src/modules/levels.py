@@ -1,11 +1,20 @@
+import asyncio
+import logging
 import random
+from collections import defaultdict
+from functools import lru_cache
 
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 import random
 
+log = logging.getLogger(__name__)
 
-def setup(bot):
+# How often queued chat XP is written to the database.
+XP_FLUSH_SECONDS = 10
+
+
+async def setup(bot):
     """Setup function to register commands with the bot"""
 
     # Ensure levels table exists
@@ -16,66 +25,96 @@ def setup(bot):
                      level INTEGER DEFAULT 1,
                      xp    INTEGER DEFAULT 0
                  )""")
+    # Serves the ORDER BY level DESC, xp DESC LIMIT 10 leaderboards.
+    c.execute("CREATE INDEX IF NOT EXISTS idx_levels_rank ON levels (level DESC, xp DESC)")
     bot.db.commit()
 
+    @lru_cache(maxsize=256)
     def calculate_xp_needed(level):
         """Calculate XP needed for next level using exponential growth"""
         return int(10 * (1.5 ** (level - 1)))
 
-    async def add_xp(user_id, xp_amount):
-        """Add XP to user and handle level ups"""
-        try:
-            c = bot.db.cursor()
+    # user_id -> XP earned since the last flush; written every XP_FLUSH_SECONDS.
+    pending_xp = defaultdict(int)
 
-            # Insert or update user record
-            c.execute(
-                "INSERT INTO levels (id, level, xp) VALUES (%s, 1, 0) ON CONFLICT (id) DO NOTHING",
-                (user_id,),
-            )
-            c.execute(
-                "UPDATE levels SET xp = xp + %s WHERE id = %s", (xp_amount, user_id)
-            )
-            bot.db.commit()
+    def add_xp(user_id, xp_amount):
+        """Queue XP for the user; the next flush writes it and handles level ups"""
+        pending_xp[user_id] += xp_amount
 
-            # Check for level up
-            c.execute("SELECT level, xp FROM levels WHERE id = %s", (user_id,))
-            current_level, current_xp = c.fetchone()
+    def _apply_xp(db, pending):
+        """Blocking half of the flush; returns [(user_id, level reached), ...]."""
+        c = db.cursor()
+        c.executemany(
+            "INSERT INTO levels (id, level, xp) VALUES (%s, 1, %s) "
+            "ON CONFLICT (id) DO UPDATE SET xp = levels.xp + EXCLUDED.xp",
+            list(pending.items()),
+        )
+        c.execute("SELECT id, level, xp FROM levels WHERE id = ANY(%s)", (list(pending),))
 
+        reached, updates = [], []
+        for user_id, current_level, current_xp in c.fetchall():
             xp_needed = calculate_xp_needed(current_level)
+            if current_xp < xp_needed:
+                continue
             while current_xp >= xp_needed:
                 current_xp -= xp_needed
                 current_level += 1
+                reached.append((user_id, current_level))
+                xp_needed = calculate_xp_needed(current_level)
+            updates.append((current_level, current_xp, user_id))
 
-                # Update database immediately
-                c.execute(
-                    "UPDATE levels SET level = %s, xp = %s WHERE id = %s",
-                    (current_level, current_xp, user_id),
-                )
-                bot.db.commit()
+        if updates:
+            c.executemany("UPDATE levels SET level = %s, xp = %s WHERE id = %s", updates)
+        db.commit()
+        return reached
 
-                try:
-                    level_channel = await bot.fetch_channel(1433244417367605318)
-                    user = await bot.fetch_user(user_id)
-                    if user and level_channel:
-                        await level_channel.send(
-                            f"Congratulations {user.mention}! You've reached level {current_level}!"
-                        )
-                except Exception as e:
-                    print(f"Failed to send level up message: {e}")
+    async def _write_xp():
+        """Write the queued XP and announce any level ups"""
+        if not pending_xp:
+            return
+        # Taken before the await so XP earned during the write waits for the next tick.
+        pending = dict(pending_xp)
+        pending_xp.clear()
+        try:
+            reached = await bot.run_db(_apply_xp, pending)
+        except Exception as e:
+            # run_db has rolled the batch back; keep it for the next flush.
+            for user_id, xp_amount in pending.items():
+                pending_xp[user_id] += xp_amount
+            log.error("XP flush error: %s", e)
+            return
 
-                xp_needed = calculate_xp_needed(current_level)
+        for user_id, level in reached:
+            try:
+                level_channel = await bot.fetch_channel(1433244417367605318)
+                user = await bot.resolve_user(user_id)
+                if user and level_channel:
+                    await level_channel.send(
+                        f"Congratulations {user.mention}! You've reached level {level}!"
+                    )
+            except Exception as e:
+                log.error("Failed to send level up message: %s", e)
 
-            return current_level, current_xp
-        except Exception as e:
-            bot.db.rollback()
-            print(f"[levels] add_xp error: {e}")
+    @tasks.loop(seconds=XP_FLUSH_SECONDS)
+    async def _flush_xp():
+        await _write_xp()
+
+    if not _flush_xp.is_running():
+        _flush_xp.start()
+
+    async def _stop_xp():
+        _flush_xp.cancel()
+        await _write_xp()
+
+    # Called by teardown() so a restart doesn't lose the last interval's XP.
+    bot.stop_xp = _stop_xp
 
     @bot.event
     async def on_message(message):
         if not message.author.bot and not message.content.startswith(
             bot.command_prefix
         ):
-            await add_xp(message.author.id, random.randint(1, 3))
+            add_xp(message.author.id, random.randint(1, 3))
         await bot.process_commands(message)
 
     @bot.command()
@@ -125,12 +164,12 @@ def setup(bot):
 
         if results:
             embed = discord.Embed(title="Level Leaderboard", color=discord.Color.gold())
-            for rank, (user_id, level, xp) in enumerate(results, start=1):
-                try:
-                    user = await bot.fetch_user(user_id)
-                    username = user.name
-                except:
-                    username = f"User {user_id}"
+            # Resolve all ten names concurrently rather than one round trip at a time.
+            users = await asyncio.gather(
+                *(bot.resolve_user(user_id) for user_id, _, _ in results), return_exceptions=True
+            )
+            for rank, ((user_id, level, xp), user) in enumerate(zip(results, users), start=1):
+                username = f"User {user_id}" if isinstance(user, BaseException) else user.name
                 total_xp = sum(calculate_xp_needed(lvl) for lvl in range(1, level)) + xp
                 embed.add_field(
                     name=f"#{rank}: {username}",
@@ -164,3 +203,8 @@ def setup(bot):
             c.execute("UPDATE levels SET level = 1, xp = 0")
             bot.db.commit()
         await ctx.send("Reset all users XP and levels.")
+
+
+async def teardown(bot):
+    """Flush queued XP when the extension is unloaded (including on bot.close())."""
+    await bot.stop_xp()
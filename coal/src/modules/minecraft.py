@@ -3,28 +3,55 @@
 import os
 import re
 import asyncio
+import logging
+import time
 import discord
 from discord.ext import commands, tasks
 from mcstatus import JavaServer
 
+log = logging.getLogger(__name__)
 
-def setup(bot):
+# Seconds a status probe is reused for before the server is asked again.
+STATUS_TTL = 20
+
+
+async def setup(bot):
     """Setup function to register commands with the bot"""
 
     MINECRAFT_SERVER_IP = os.getenv('MINECRAFT_SERVER_IP')
     MINECRAFT_SERVER_PORT = os.getenv('MINECRAFT_SERVER_PORT')
     VOICE_CHANNEL = 1422645848923176990  # Replace this with your test channel ID
 
+    # Last probe result and when it was taken; the lock makes concurrent
+    # callers (status spam, the voice channel task) share a single probe.
+    cached_status = None
+    cached_at = 0.0
+    status_lock = asyncio.Lock()
+    # The looked-up server is kept between probes; a failed probe drops it so
+    # the next one resolves the address again.
+    mc_server = None
+
     async def get_server_status():
+        """Return the server status, probing at most once per STATUS_TTL."""
+        nonlocal cached_status, cached_at
+        async with status_lock:
+            if cached_status is None or time.monotonic() - cached_at >= STATUS_TTL:
+                cached_status = await _query_server_status()
+                cached_at = time.monotonic()
+            return cached_status
+
+    async def _query_server_status():
         """Query the Minecraft server and return status information."""
+        nonlocal mc_server
         try:
             server_address = MINECRAFT_SERVER_IP
             if not server_address:
                 raise ValueError("MINECRAFT_SERVER environment variable is not set.")
 
-            server = JavaServer.lookup(server_address)
             # Use asyncio.to_thread for blocking network calls to keep the main event loop responsive
-            status = await asyncio.to_thread(server.status)
+            if mc_server is None:
+                mc_server = await asyncio.to_thread(JavaServer.lookup, server_address)
+            status = await asyncio.to_thread(mc_server.status)
 
             return {
                 'online': True,
@@ -37,6 +64,7 @@ def setup(bot):
                 'motd': status.description
             }
         except Exception as e:
+            mc_server = None
             return {
                 'online': False,
                 'error': str(e)
@@ -130,12 +158,12 @@ def setup(bot):
             channel = bot.get_channel(channel_id)
 
             if not channel:
-                print(f'Voice channel {VOICE_CHANNEL} not found')
+                log.warning('Voice channel %s not found', VOICE_CHANNEL)
                 return
 
             # Check if the channel is actually a voice channel (2) to avoid errors
             if channel.type != discord.ChannelType.voice:
-                print(f'Channel {VOICE_CHANNEL} is not a voice channel. Skipping update.')
+                log.warning('Channel %s is not a voice channel. Skipping update.', VOICE_CHANNEL)
                 update_voice_channel.stop()  # type: ignore[attr-defined]  # Stop the task if it's the wrong channel type
                 return
 
@@ -148,24 +176,24 @@ def setup(bot):
 
             # Only update if the name has changed (to avoid rate limits)
             if channel.name != new_name:
-                await channel.edit(name=new_name)
-                print(f'Updated voice channel to: {new_name}')
+                await bot.with_backoff(lambda: channel.edit(name=new_name))
+                log.info('Updated voice channel to: %s', new_name)
 
         except discord.errors.HTTPException as e:
             # Check for 429 (rate limit) or 403 (forbidden/permissions)
             if e.status == 429:
-                print(f'Rate limited while updating voice channel name: {e}')
+                log.warning('Rate limited while updating voice channel name: %s', e)
             elif e.status == 403:
-                print(f'Permission denied to edit voice channel name: {e}')
+                log.warning('Permission denied to edit voice channel name: %s', e)
             else:
-                print(f'Failed to update voice channel (HTTP error): {e}')
+                log.error('Failed to update voice channel (HTTP error): %s', e)
 
         except ValueError:
-            print(f'Error: VOICE_CHANNEL environment variable "{VOICE_CHANNEL}" is not a valid integer ID.')
+            log.error('VOICE_CHANNEL environment variable "%s" is not a valid integer ID.', VOICE_CHANNEL)
             update_voice_channel.stop()  # type: ignore[attr-defined]
 
         except Exception as e:
-            print(f'Error in voice channel update task: {e}')
+            log.error('Error in voice channel update task: %s', e)
 
     @update_voice_channel.before_loop
     async def before_update_voice_channel():
@@ -176,7 +204,7 @@ def setup(bot):
     if VOICE_CHANNEL:
         update_voice_channel.start()
     else:
-        print('No voice channel ID configured - skipping auto-update')
+        log.warning('No voice channel ID configured - skipping auto-update')
 
     @bot.command()
     async def join(ctx, channel):
@@ -2,13 +2,16 @@
 
 import asyncio
 import datetime
+import logging
 import re
 import secrets
 
 import discord
 
+log = logging.getLogger(__name__)
 
-def setup(bot):
+
+async def setup(bot):
     """Setup function to register commands with the bot"""
 
     c = bot.db.cursor()
@@ -141,7 +144,7 @@ def setup(bot):
                 for rid, user_id, channel_id, message in due:
                     try:
                         channel = bot.get_channel(channel_id) or await bot.fetch_channel(channel_id)
-                        user = bot.get_user(user_id) or await bot.fetch_user(user_id)
+                        user = await bot.resolve_user(user_id)
                         embed = discord.Embed(
                             title='Reminder!',
                             description=message,
@@ -151,14 +154,14 @@ def setup(bot):
                         embed.set_footer(text=f'ID: {rid}')
                         await channel.send(f'{user.mention}', embed=embed)
                     except Exception as e:
-                        print(f'[reminders] Failed to fire {rid}: {e}')
+                        log.error('Failed to fire %s: %s', rid, e)
                     fired.append(rid)
                 for rid in fired:
                     c.execute('DELETE FROM reminders WHERE id = %s', (rid,))
                 bot.db.commit()
             except Exception as e:
                 bot.db.rollback()
-                print(f'[reminders] Loop error: {e}')
+                log.error('Loop error: %s', e)
             await asyncio.sleep(15)
 
     asyncio.create_task(_reminder_loop())
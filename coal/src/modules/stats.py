@@ -1,12 +1,15 @@
 """Stats module - server and user statistics"""
 
 import datetime
+import logging
 
 import discord
 from discord.ext import tasks
 
+log = logging.getLogger(__name__)
 
-def setup(bot):
+
+async def setup(bot):
     """Setup function to register commands with the bot"""
 
     c = bot.db.cursor()
@@ -23,11 +26,11 @@ def setup(bot):
     # checkpoint flushes accrued time so a restart loses at most a few minutes.
     _voice_joins = {}  # (user_id, guild_id) -> datetime joined/last-checkpointed
 
-    def _credit_voice(user_id, guild_id, secs):
+    def _credit_voice(db, user_id, guild_id, secs):
         if secs <= 0:
             return
         try:
-            c = bot.db.cursor()
+            c = db.cursor()
             c.execute(
                 """
                 INSERT INTO user_stats (user_id, guild_id, messages_sent, voice_seconds)
@@ -36,37 +39,48 @@ def setup(bot):
             """,
                 (user_id, guild_id, secs, secs),
             )
-            bot.db.commit()
+            db.commit()
         except Exception as e:
-            bot.db.rollback()
-            print(f"[stats] voice credit error: {e}")
+            db.rollback()
+            log.error("Voice credit error: %s", e)
 
-    def _flush_voice_sessions():
-        """Credit accrued time for every active session and reset its start."""
+    def _take_voice_credits():
+        """Accrued (user_id, guild_id, secs) per active session; resets each start."""
         now = datetime.datetime.utcnow()
+        credits = []
         for key, joined in list(_voice_joins.items()):
             secs = int((now - joined).total_seconds())
             if secs > 0:
-                _credit_voice(key[0], key[1], secs)
+                credits.append((key[0], key[1], secs))
                 _voice_joins[key] = now
+        return credits
 
-    async def _on_message_stats(message):
-        if message.author.bot or not message.guild:
-            return
+    def _credit_voices(db, credits):
+        for user_id, guild_id, secs in credits:
+            _credit_voice(db, user_id, guild_id, secs)
+
+    def _count_message(db, user_id, guild_id):
         try:
-            c = bot.db.cursor()
+            c = db.cursor()
             c.execute(
                 """
                 INSERT INTO user_stats (user_id, guild_id, messages_sent, voice_seconds)
                 VALUES (%s, %s, 1, 0)
                 ON CONFLICT(user_id, guild_id) DO UPDATE SET messages_sent = user_stats.messages_sent + 1
             """,
-                (message.author.id, message.guild.id),
+                (user_id, guild_id),
             )
-            bot.db.commit()
+            db.commit()
         except Exception as e:
-            bot.db.rollback()
-            print(f"[stats] on_message error: {e}")
+            db.rollback()
+            log.error("on_message error: %s", e)
+
+    async def _on_message_stats(message):
+        if message.author.bot or not message.guild:
+            return
+        # Every message lands here, so the write goes to the database thread
+        # instead of holding up the event loop for a Supabase round trip.
+        await bot.run_db(_count_message, message.author.id, message.guild.id)
 
     # Use add_listener so we don't overwrite the on_message handler in levels.py
     bot.add_listener(_on_message_stats, "on_message")
@@ -83,23 +97,27 @@ def setup(bot):
             joined = _voice_joins.pop(key, None)
             if joined is not None:
                 secs = int((datetime.datetime.utcnow() - joined).total_seconds())
-                _credit_voice(member.id, member.guild.id, secs)
+                await bot.run_db(_credit_voice, member.id, member.guild.id, secs)
         # Moved channels / mute-deafen change: keep the session running.
         elif after.channel is not None and key not in _voice_joins:
             _voice_joins[key] = datetime.datetime.utcnow()
 
     bot.add_listener(_on_voice_update, "on_voice_state_update")
 
-    # Seed sessions for anyone already in voice, then checkpoint periodically.
-    for guild in bot.guilds:
-        for vc in guild.voice_channels:
-            for m in vc.members:
-                if not m.bot:
-                    _voice_joins[(m.id, guild.id)] = datetime.datetime.utcnow()
+    # Seed sessions for anyone already in voice once the guild cache is
+    # filled (modules now load before login), then checkpoint periodically.
+    async def _seed_voice_sessions():
+        for guild in bot.guilds:
+            for vc in guild.voice_channels:
+                for m in vc.members:
+                    if not m.bot:
+                        _voice_joins.setdefault((m.id, guild.id), datetime.datetime.utcnow())
+
+    bot.add_listener(_seed_voice_sessions, "on_ready")
 
     @tasks.loop(minutes=5)
     async def _voice_checkpoint():
-        _flush_voice_sessions()
+        await bot.run_db(_credit_voices, _take_voice_credits())
 
     if not _voice_checkpoint.is_running():
         _voice_checkpoint.start()
@@ -297,7 +315,6 @@ def setup(bot):
         )
 
     def _voice_leaderboard_embed(guild):
-        _flush_voice_sessions()  # reflect ongoing calls
         c = bot.db.cursor()
         c.execute(
             "SELECT user_id, voice_seconds FROM user_stats "
@@ -324,6 +341,12 @@ def setup(bot):
         "voice": _voice_leaderboard_embed,
     }
 
+    async def _build_page(page, guild):
+        if page == "voice":
+            # Reflect ongoing calls: credit them on the database thread first.
+            await bot.run_db(_credit_voices, _take_voice_credits())
+        return _builders[page](guild)
+
     class LeaderboardView(discord.ui.View):
         """Button-paginated leaderboard: Levels, Economy, Messages, Voice."""
 
@@ -339,7 +362,7 @@ def setup(bot):
                     child.disabled = child.custom_id == page
 
         async def _show(self, interaction, page):
-            embed = _builders[page](self.guild)
+            embed = await _build_page(page, self.guild)
             self._set_active(page)
             await interaction.response.edit_message(embed=embed, view=self)
 
@@ -393,7 +416,7 @@ def setup(bot):
         if page not in _PAGES:
             page = "levels"
         view = LeaderboardView(ctx.guild, start_page=page)
-        view.message = await ctx.send(embed=_builders[page](ctx.guild), view=view)
+        view.message = await ctx.send(embed=await _build_page(page, ctx.guild), view=view)
 
     # Expose so levels.py / economy.py shortcut commands can open the same view.
     bot.send_leaderboard = _send_leaderboard
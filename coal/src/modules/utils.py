@@ -8,13 +8,17 @@ import re
 import sys
 import textwrap
 import traceback
+from collections import defaultdict, deque
 from contextlib import redirect_stdout
 import discord
 from discord.ext import commands
 from PIL import Image
 
+# Deleted messages kept per channel; each -snipe takes the newest one left.
+SNIPE_DEPTH = 5
 
-def setup(bot):
+
+async def setup(bot):
     """Setup function to register commands with the bot"""
 
     @bot.command()
@@ -62,7 +66,9 @@ def setup(bot):
     async def echo(ctx, *, message):
         """Echoes the provided message back to the user."""
         await ctx.send(message)
-        await ctx.message.delete()
+        # delay=0 hands the delete to a background task (errors are ignored),
+        # so the command returns without waiting on it.
+        await ctx.message.delete(delay=0)
 
     @bot.command(
         name="color",
@@ -137,33 +143,34 @@ def setup(bot):
         target = random.choice(members)
 
         if ctx.message.reference is not None:
-            try:
-                await ctx.message.delete()
-            except (discord.NotFound, discord.Forbidden):
-                pass
+            await ctx.message.delete(delay=0)
 
         await ctx.send(target.mention)
 
     # Snipe functionality
-    snipe_messages_delete = {}
+    # channel_id -> deque of (content, author, created_at), newest first.
+    snipe_messages_delete = defaultdict(lambda: deque(maxlen=SNIPE_DEPTH))
 
     @bot.event
     async def on_message_delete(message):
         # Ignore DMs or messages without content (e.g., embeds, system messages)
         if message.guild and message.content:
-            snipe_messages_delete[message.channel.id] = (
+            snipe_messages_delete[message.channel.id].appendleft((
                 message.content,
                 message.author,
                 message.created_at,
-            )
+            ))
 
     @bot.command()
     async def snipe(ctx):
         """Retrieves the last deleted message in the channel."""
-        sniped_data = snipe_messages_delete.get(ctx.channel.id)
+        recent = snipe_messages_delete.get(ctx.channel.id)
 
-        if sniped_data:
-            content, author, timestamp = sniped_data
+        if recent:
+            # Popped so it can't be sniped again; the next -snipe shows the one before.
+            content, author, timestamp = recent.popleft()
+            if not recent:
+                del snipe_messages_delete[ctx.channel.id]
 
             embed = discord.Embed(
                 description=content, color=discord.Color.purple(), timestamp=timestamp
@@ -173,9 +180,6 @@ def setup(bot):
             )
             embed.set_footer(text=f"Sniped by {ctx.author.name}")
 
-            # Remove the message immediately after sniping so it can't be sniped again
-            del snipe_messages_delete[ctx.channel.id]
-
             await ctx.send(embed=embed)
         else:
             await ctx.send("No recently deleted messages to snipe. 😔")
@@ -0,0 +1,91 @@
+"""
+charts.py – matplotlib rendering for the chart worker processes.
+
+IronBot.chart_pool spawns its workers, which import this module to unpickle
+the draw function. It therefore only imports matplotlib/numpy and has no
+bot-level side effects (no discord, dotenv or logging setup).
+"""
+import io
+
+
+# matplotlib is optional and slow to import, so it is probed once on a worker
+# thread when the stats cog loads; the modules are kept here for the renderer.
+_HAS_MPL: bool | None = None
+Figure = FigureCanvasAgg = np = None
+
+# Dark chart theme, applied to rcParams once by the probe so each render only
+# has to draw data rather than re-style every artist.
+_CHART_STYLE = {
+    'figure.facecolor': '#2b2d31',
+    'axes.facecolor': '#2b2d31',
+    'axes.edgecolor': '#40444b',
+    'axes.labelcolor': 'white',
+    'axes.titlecolor': 'white',
+    'axes.axisbelow': True,
+    'xtick.color': 'white',
+    'ytick.color': 'white',
+    'grid.color': '#40444b',
+    'legend.facecolor': '#40444b',
+    'legend.labelcolor': 'white',
+    'font.size': 10,
+}
+
+
+def probe_matplotlib():
+    """Import matplotlib/numpy and apply the chart theme; records whether they exist."""
+    global _HAS_MPL, Figure, FigureCanvasAgg, np
+    try:
+        import matplotlib
+        from matplotlib.figure import Figure as _Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg as _Canvas
+        import numpy as _np
+    except ImportError:
+        _HAS_MPL = False
+        return
+    matplotlib.rcParams.update(_CHART_STYLE)
+    Figure, FigureCanvasAgg, np = _Figure, _Canvas, _np
+    _HAS_MPL = True
+
+
+def has_matplotlib() -> bool:
+    return bool(_HAS_MPL)
+
+
+def draw_completion_chart(labels, tasks_done, on_time, title: str) -> bytes:
+    """Render the completed/on-time bar chart to PNG bytes; runs in a chart worker."""
+    if Figure is None:
+        # Fresh worker: import matplotlib and apply the theme once per process.
+        probe_matplotlib()
+    # Draw on a bare Figure + Agg canvas: no pyplot figure manager, and a
+    # fixed layout instead of tight_layout/bbox_inches='tight', which
+    # each cost an extra draw pass.
+    done = np.asarray(tasks_done, dtype=np.int32)
+    ot = np.asarray(on_time, dtype=np.int32)
+    x = np.arange(done.size, dtype=np.int32)
+    width = 0.35
+
+    fig = Figure(figsize=(10, 5), dpi=120)
+    canvas = FigureCanvasAgg(fig)
+    fig.subplots_adjust(left=0.08, right=0.98, top=0.9, bottom=0.22)
+    ax = fig.add_subplot()
+
+    bars1 = ax.bar(x - width / 2, done, width, label='Completed', color='#5865F2', zorder=3)
+    bars2 = ax.bar(x + width / 2, ot, width, label='On Time', color='#57F287', zorder=3)
+
+    ax.set_xlabel('Date')
+    ax.set_ylabel('Tasks')
+    ax.set_title(title, fontsize=14, fontweight='bold')
+    ax.set_xticks(x)
+    ax.set_xticklabels(labels, rotation=45, ha='right', fontsize=8)
+    ax.yaxis.grid(True)
+    ax.legend()
+
+    # Label non-zero bars with their height.
+    ax.bar_label(bars1, labels=[str(v) if v else '' for v in done],
+                 color='white', fontsize=8, padding=1)
+    ax.bar_label(bars2, labels=[str(v) if v else '' for v in ot],
+                 color='white', fontsize=8, padding=1)
+
+    buf = io.BytesIO()
+    canvas.print_png(buf)
+    return buf.getvalue()
@@ -3,11 +3,16 @@ from discord.ext import commands
 import aiosqlite
 import os
 import asyncio
+import atexit
+import concurrent.futures
+import contextlib
 import logging
+import logging.handlers
+import multiprocessing
+import queue
+import random
 from dotenv import load_dotenv
 
-load_dotenv()
-logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(name)s: %(message)s')
 log = logging.getLogger('iron')
 
 MODULES = [
@@ -159,8 +164,102 @@ DB_TABLES = [
         voice_seconds INTEGER DEFAULT 0,
         PRIMARY KEY (user_id, guild_id)
     )''',
+    # ── Scheduled messages (!schedule) ───────────────────────────────────────
+    '''CREATE TABLE IF NOT EXISTS scheduled_messages (
+        id         INTEGER PRIMARY KEY AUTOINCREMENT,
+        channel_id INTEGER NOT NULL,
+        send_at    REAL    NOT NULL,
+        message    TEXT    NOT NULL
+    )''',
+]
+
+_DUE_ORD = ("INTEGER GENERATED ALWAYS AS "
+            "(CAST(julianday(substr(due_date, 1, 10)) - 1721424.5 AS INTEGER)) VIRTUAL")
+
+# Columns added after their table first shipped, as (table, column, definition).
+# CREATE TABLE IF NOT EXISTS leaves existing tables untouched, so missing ones
+# are ALTERed in on startup.
+DB_COLUMNS = [
+    # Sort key for task lists; generated so it can never drift from `priority`.
+    ('tasks', 'priority_rank',
+     "INTEGER GENERATED ALWAYS AS "
+     "(CASE priority WHEN 'high' THEN 1 WHEN 'medium' THEN 2 ELSE 3 END) VIRTUAL"),
+    # date.toordinal() of due_date, for integer range filters in today/week.
+    ('tasks', 'due_ord', _DUE_ORD),
+    ('assignments', 'due_ord', _DUE_ORD),
+]
+
+# Created after DB_COLUMNS so they may cover migrated columns.
+DB_INDEXES = [
+    # Back the per-user "open items by due day" filter used by today/week.
+    '''CREATE INDEX IF NOT EXISTS idx_tasks_user_guild_due
+        ON tasks(user_id, guild_id, status, due_ord)''',
+    '''CREATE INDEX IF NOT EXISTS idx_tasks_user_guild_rank
+        ON tasks(user_id, guild_id, priority_rank, due_date)''',
+    '''CREATE INDEX IF NOT EXISTS idx_assignments_user_guild_due
+        ON assignments(user_id, guild_id, status, due_ord)''',
+    '''CREATE INDEX IF NOT EXISTS idx_assignments_course
+        ON assignments(user_id, guild_id, course)''',
+    # One row per user/guild/day so completions can UPSERT (see TASK_STATS_MERGE).
+    '''CREATE UNIQUE INDEX IF NOT EXISTS idx_task_stats_day
+        ON task_stats(user_id, guild_id, date)''',
+    # Obituary lookups: one user's deaths in cntr order.
+    '''CREATE INDEX IF NOT EXISTS idx_death_log_user
+        ON death_log(user_id, cntr)''',
+    # MAX(cntr) when the grave cog loads, and the full obituary dump.
+    'CREATE INDEX IF NOT EXISTS idx_death_log_cntr ON death_log(cntr)',
+    # Top-10 wealth and level boards read these in order and stop.
+    'CREATE INDEX IF NOT EXISTS idx_balances_balance ON balances(balance DESC)',
+    'CREATE INDEX IF NOT EXISTS idx_levels_rank ON levels(level DESC, xp DESC)',
+]
+
+# One-time data fixes, run in order. PRAGMA user_version records how many a
+# database has had, so each runs once; append new ones, never reorder.
+DB_MIGRATIONS = [
+    # 1: Obituaries match user_id exactly, so rows carried over from the older
+    # bots that stored raw <@id>/<@!id> mentions are reduced to the digits.
+    '''UPDATE death_log
+        SET user_id = REPLACE(REPLACE(REPLACE(user_id, '<@!', ''), '<@', ''), '>', '')
+        WHERE user_id LIKE '<@%' ''',
 ]
 
+# Databases from before idx_task_stats_day could hold several task_stats rows
+# per user/guild/day. Run once, before that index is first created: fold each
+# day's counts into its oldest row, then drop the rest.
+TASK_STATS_MERGE = (
+    '''UPDATE task_stats SET
+        tasks_completed       = (SELECT SUM(d.tasks_completed) FROM task_stats d
+                                 WHERE d.user_id = task_stats.user_id
+                                   AND d.guild_id = task_stats.guild_id AND d.date = task_stats.date),
+        tasks_on_time         = (SELECT SUM(d.tasks_on_time) FROM task_stats d
+                                 WHERE d.user_id = task_stats.user_id
+                                   AND d.guild_id = task_stats.guild_id AND d.date = task_stats.date),
+        tasks_late            = (SELECT SUM(d.tasks_late) FROM task_stats d
+                                 WHERE d.user_id = task_stats.user_id
+                                   AND d.guild_id = task_stats.guild_id AND d.date = task_stats.date),
+        assignments_completed = (SELECT SUM(d.assignments_completed) FROM task_stats d
+                                 WHERE d.user_id = task_stats.user_id
+                                   AND d.guild_id = task_stats.guild_id AND d.date = task_stats.date)
+    WHERE id IN (
+        SELECT MIN(id) FROM task_stats GROUP BY user_id, guild_id, date HAVING COUNT(*) > 1
+    )''',
+    '''DELETE FROM task_stats WHERE id NOT IN (
+        SELECT MIN(id) FROM task_stats GROUP BY user_id, guild_id, date
+    )''',
+)
+
+# Read-only connections handed out by IronBot.reader(); reads on these run
+# alongside writes on bot.db instead of queueing behind them (WAL mode).
+READER_POOL_SIZE = 4
+# Cache/mmap settings are per connection, so readers need them as well as bot.db.
+CONN_PRAGMAS = ('temp_store = MEMORY', 'mmap_size = 268435456', 'cache_size = -20000')
+# Prepared statements kept per connection (sqlite3 defaults to 100); the hot
+# queries are module-level constants so the same text always hits the cache.
+STATEMENT_CACHE_SIZE = 512
+# Tries for a call that keeps getting 429s, and the longest wait between two.
+BACKOFF_ATTEMPTS = 6
+BACKOFF_CAP = 30
+
 
 class IronBot(commands.Bot):
     def __init__(self):
@@ -175,9 +274,29 @@ class IronBot(commands.Bot):
 
     async def setup_hook(self):
         db_path = os.getenv('DATABASE', 'iron_db.db')
-        self.db = await aiosqlite.connect(db_path)
+        self.db = await aiosqlite.connect(db_path, cached_statements=STATEMENT_CACHE_SIZE)
         self.db.row_factory = aiosqlite.Row
+        # WAL lets reads proceed during a write, and with synchronous=NORMAL a
+        # commit no longer waits on an fsync of the main database file.
+        for pragma in ('journal_mode = WAL', 'synchronous = NORMAL') + CONN_PRAGMAS:
+            await self.db.execute(f'PRAGMA {pragma}')
         await self._init_db()
+        self.db_readers = asyncio.Queue()
+        for _ in range(READER_POOL_SIZE):
+            conn = await aiosqlite.connect(
+                f'file:{db_path}?mode=ro', uri=True, cached_statements=STATEMENT_CACHE_SIZE,
+            )
+            conn.row_factory = aiosqlite.Row
+            for pragma in CONN_PRAGMAS:
+                await conn.execute(f'PRAGMA {pragma}')
+            self.db_readers.put_nowait(conn)
+        # Charts render in worker processes since matplotlib holds the GIL for
+        # most of a draw. 'spawn' avoids forking the running event loop; the
+        # workers only need charts.py (see modules/stats.py).
+        self.chart_pool = concurrent.futures.ProcessPoolExecutor(
+            max_workers=os.cpu_count(),
+            mp_context=multiprocessing.get_context('spawn'),
+        )
 
         for module in MODULES:
             try:
@@ -190,9 +309,64 @@ class IronBot(commands.Bot):
         async with self.db.cursor() as cur:
             for sql in DB_TABLES:
                 await cur.execute(sql)
+            for table, column, definition in DB_COLUMNS:
+                await cur.execute('SELECT 1 FROM pragma_table_xinfo(?) WHERE name = ?', (table, column))
+                if await cur.fetchone() is None:
+                    await cur.execute(f'ALTER TABLE {table} ADD COLUMN {column} {definition}')
+            await cur.execute('PRAGMA user_version')
+            version = (await cur.fetchone())[0]
+            for sql in DB_MIGRATIONS[version:]:
+                await cur.execute(sql)
+            if version < len(DB_MIGRATIONS):
+                await cur.execute(f'PRAGMA user_version = {len(DB_MIGRATIONS)}')
+            await cur.execute("SELECT 1 FROM sqlite_master WHERE name = 'idx_task_stats_day'")
+            if await cur.fetchone() is None:
+                for sql in TASK_STATS_MERGE:
+                    await cur.execute(sql)
+            for sql in DB_INDEXES:
+                await cur.execute(sql)
+            # Gather planner statistics the first time so the indexes get used.
+            await cur.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'")
+            if await cur.fetchone() is None:
+                await cur.execute('ANALYZE')
         await self.db.commit()
         log.info('Database initialised.')
 
+    @contextlib.asynccontextmanager
+    async def reader(self):
+        """Borrow a read-only connection from the pool for the duration of the block."""
+        conn = await self.db_readers.get()
+        try:
+            yield conn
+        finally:
+            self.db_readers.put_nowait(conn)
+
+    @contextlib.asynccontextmanager
+    async def savepoint(self, name: str):
+        """Run the block's writes on bot.db inside SAVEPOINT `name`.
+
+        If the block raises, only its own statements are rolled back; whatever
+        other cogs have executed but not yet committed is kept. Callers commit.
+        """
+        await self.db.execute(f'SAVEPOINT {name}')
+        try:
+            yield self.db
+        except BaseException:
+            await self.db.execute(f'ROLLBACK TO {name}')
+            await self.db.execute(f'RELEASE {name}')
+            raise
+        await self.db.execute(f'RELEASE {name}')
+
+    async def with_backoff(self, call, attempts: int = BACKOFF_ATTEMPTS):
+        """Await call(), retrying 429s with capped exponential backoff plus jitter."""
+        for attempt in range(attempts):
+            try:
+                return await call()
+            except discord.HTTPException as exc:
+                if exc.status != 429 or attempt == attempts - 1:
+                    raise
+                await asyncio.sleep(min(2 ** attempt, BACKOFF_CAP) + random.random())
+
     async def on_ready(self):
         log.info('Logged in as %s (ID %s)', self.user, self.user.id)
         await self.change_presence(
@@ -231,11 +405,31 @@ class IronBot(commands.Bot):
             log.error('Unhandled error in %s: %s', ctx.command, error, exc_info=error)
 
     async def close(self):
-        await self.db.close()
+        # Unload cogs first so their cog_unload hooks can still write.
         await super().close()
+        self.chart_pool.shutdown(wait=False, cancel_futures=True)
+        while not self.db_readers.empty():
+            await self.db_readers.get_nowait().close()
+        await self.db.close()
+
+
+def _setup_logging():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(name)s: %(message)s')
+    # Move basicConfig's stream handler behind a queue: callers only enqueue and
+    # a listener thread does the writes, so a slow stdout/journald pipe can't
+    # stall the event loop. Stopped at exit to drain what is still queued.
+    root = logging.getLogger()
+    listener = logging.handlers.QueueListener(queue.SimpleQueue(), *root.handlers)
+    root.handlers = [logging.handlers.QueueHandler(listener.queue)]
+    listener.start()
+    atexit.register(listener.stop)
 
 
 def main():
+    # Done here rather than at import: chart_pool's spawned workers re-import
+    # this file, and must not load .env or start listeners of their own.
+    load_dotenv()
+    _setup_logging()
     token = os.getenv('DISCORD_TOKEN')
     if not token:
         raise RuntimeError('DISCORD_TOKEN is not set in the environment.')
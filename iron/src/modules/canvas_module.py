@@ -353,6 +353,9 @@ class Canvas(commands.Cog):
                     added += 1
 
         await self.bot.db.commit()
+        tasks_cog = self.bot.get_cog('Tasks')
+        if added and tasks_cog is not None:
+            tasks_cog.bump_version(ctx.author.id, ctx.guild.id)
         await ctx.send(
             embed=discord.Embed(
                 title='🔄 Canvas Sync Complete',
@@ -1,9 +1,19 @@
 """modules/economy.py – Economy / currency system (Cog version)."""
 import random
+from collections import Counter
 import discord
 from discord.ext import commands
 from datetime import datetime
 
+_DICE_FACES = (1, 2, 3, 4, 5, 6)
+_SLOT_SYMBOLS = ('⭐', '🍒', '🍋', '🍊', '🍉', '7️⃣', '💰', '💎', '💵')
+
+SQL_GET_BALANCE = 'SELECT balance FROM balances WHERE user_id = ?'
+SQL_OPEN_ACCOUNT = 'INSERT INTO balances (user_id, balance) VALUES (?, 1000)'
+SQL_ADD_BALANCE = 'UPDATE balances SET balance = balance + ? WHERE user_id = ?'
+# Applies a bet's net result only if the balance still covers the stake.
+SQL_SETTLE_BET = 'UPDATE balances SET balance = balance + ? WHERE user_id = ? AND balance >= ? RETURNING balance'
+
 
 class Economy(commands.Cog):
     """Coins, gambling, and the server economy."""
@@ -15,19 +25,41 @@ class Economy(commands.Cog):
 
     async def _get_balance(self, user_id: int) -> int:
         async with self.bot.db.cursor() as cur:
-            await cur.execute('SELECT balance FROM balances WHERE user_id = ?', (user_id,))
+            await cur.execute(SQL_GET_BALANCE, (user_id,))
             row = await cur.fetchone()
             if row:
                 return row['balance']
-            await cur.execute('INSERT INTO balances (user_id, balance) VALUES (?, 1000)', (user_id,))
+            await cur.execute(SQL_OPEN_ACCOUNT, (user_id,))
         await self.bot.db.commit()
         return 1000
 
     async def _add_balance(self, user_id: int, amount: int):
         await self._get_balance(user_id)  # ensure row exists
         async with self.bot.db.cursor() as cur:
-            await cur.execute('UPDATE balances SET balance = balance + ? WHERE user_id = ?', (amount, user_id))
+            await cur.execute(SQL_ADD_BALANCE, (amount, user_id))
+        await self.bot.db.commit()
+
+    async def _settle_bet(self, user_id: int, bet: int, delta: int) -> tuple[bool, int]:
+        """Apply a bet's net result; returns (settled, balance).
+
+        For an existing player who can cover the stake this is one guarded
+        UPDATE and one commit. Otherwise the balance is read (opening the
+        account at 1000 if needed) and the update retried once.
+        """
+        async with self.bot.db.cursor() as cur:
+            await cur.execute(SQL_SETTLE_BET, (delta, user_id, bet))
+            row = await cur.fetchone()
+        if row is None:
+            bal = await self._get_balance(user_id)
+            if bal < bet:
+                return False, bal
+            async with self.bot.db.cursor() as cur:
+                await cur.execute(SQL_SETTLE_BET, (delta, user_id, bet))
+                row = await cur.fetchone()
+            if row is None:
+                return False, bal
         await self.bot.db.commit()
+        return True, row['balance']
 
     # ── Commands ──────────────────────────────────────────────────────────────
 
@@ -110,8 +142,8 @@ class Economy(commands.Cog):
             return await ctx.send(f'You only have **{bal:,}** coins.')
         await self._get_balance(user.id)
         async with self.bot.db.cursor() as cur:
-            await cur.execute('UPDATE balances SET balance = balance - ? WHERE user_id = ?', (amount, ctx.author.id))
-            await cur.execute('UPDATE balances SET balance = balance + ? WHERE user_id = ?', (amount, user.id))
+            await cur.execute(SQL_ADD_BALANCE, (-amount, ctx.author.id))
+            await cur.execute(SQL_ADD_BALANCE, (amount, user.id))
         await self.bot.db.commit()
         await ctx.send(embed=discord.Embed(
             description=f'💸 Transferred **{amount:,}** coins to {user.mention}.',
@@ -127,17 +159,14 @@ class Economy(commands.Cog):
         guess = 'heads' if guess in ('heads', 'h') else 'tails'
         if bet <= 0:
             return await ctx.send('Bet must be positive.')
-        bal = await self._get_balance(ctx.author.id)
-        if bal < bet:
-            return await ctx.send(f'You only have **{bal:,}** coins.')
 
         result = random.choice(['heads', 'tails'])
         won = guess == result
         delta = bet if won else -bet
 
-        async with self.bot.db.cursor() as cur:
-            await cur.execute('UPDATE balances SET balance = balance + ? WHERE user_id = ?', (delta, ctx.author.id))
-        await self.bot.db.commit()
+        settled, bal = await self._settle_bet(ctx.author.id, bet, delta)
+        if not settled:
+            return await ctx.send(f'You only have **{bal:,}** coins.')
 
         embed = discord.Embed(
             title=f'🪙 Coin Flip — {result.title()}',
@@ -153,19 +182,16 @@ class Economy(commands.Cog):
             return await ctx.send('Roll 1–20 dice.')
         if bet <= 0:
             return await ctx.send('Bet must be positive.')
-        bal = await self._get_balance(ctx.author.id)
-        if bal < bet:
-            return await ctx.send(f'You only have **{bal:,}** coins.')
 
-        rolls = [random.randint(1, 6) for _ in range(dice)]
+        rolls = random.choices(_DICE_FACES, k=dice)
         total = sum(rolls)
         target = dice * 3
         won = total >= target
         delta = bet * 5 if won else -bet
 
-        async with self.bot.db.cursor() as cur:
-            await cur.execute('UPDATE balances SET balance = balance + ? WHERE user_id = ?', (delta, ctx.author.id))
-        await self.bot.db.commit()
+        settled, bal = await self._settle_bet(ctx.author.id, bet, delta)
+        if not settled:
+            return await ctx.send(f'You only have **{bal:,}** coins.')
 
         roll_str = ' + '.join(str(r) for r in rolls) + f' = **{total}**'
         embed = discord.Embed(
@@ -181,33 +207,33 @@ class Economy(commands.Cog):
         """Spin the slot machine."""
         if bet <= 0 or bet > 3000:
             return await ctx.send('Bet must be between 1 and 3,000 coins.')
-        bal = await self._get_balance(ctx.author.id)
-        if bal < bet:
-            return await ctx.send(f'You only have **{bal:,}** coins.')
 
-        symbols = ['⭐', '🍒', '🍋', '🍊', '🍉', '7️⃣', '💰', '💎', '💵']
-        reels = [random.choice(symbols) for _ in range(3)]
-        stars = reels.count('⭐')
+        reels = random.choices(_SLOT_SYMBOLS, k=3)
+        counts = Counter(reels)
+        stars = counts['⭐']
+        # Three reels: one distinct symbol is a triple, at most two means a pair.
+        triple = len(counts) == 1
+        pair = len(counts) <= 2
 
         if stars == 3:
             multiplier, label = 100, '🎰 **JACKPOT!**'
-        elif stars == 0 and reels[0] == reels[1] == reels[2]:
+        elif stars == 0 and triple:
             multiplier, label = 50, '🎉 Triple match!'
-        elif stars == 1 and len(set(reels)) == 2:
+        elif stars == 1 and pair:
             multiplier, label = 10, '✨ Wild match!'
         elif stars == 2:
             multiplier, label = 5, '⭐ Two stars!'
         elif stars == 1:
             multiplier, label = 3, '⭐ One star!'
-        elif reels[0] == reels[1] or reels[1] == reels[2] or reels[0] == reels[2]:
+        elif pair:
             multiplier, label = 2, '👀 Pair!'
         else:
             multiplier, label = 0, '😔 No match.'
 
         delta = bet * multiplier - bet if multiplier else -bet
-        async with self.bot.db.cursor() as cur:
-            await cur.execute('UPDATE balances SET balance = balance + ? WHERE user_id = ?', (delta, ctx.author.id))
-        await self.bot.db.commit()
+        settled, bal = await self._settle_bet(ctx.author.id, bet, delta)
+        if not settled:
+            return await ctx.send(f'You only have **{bal:,}** coins.')
 
         embed = discord.Embed(
             title='🎰 Slot Machine',
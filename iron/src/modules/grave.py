@@ -1,11 +1,58 @@
 """modules/grave.py – Graveyard / death log system (Cog version)."""
 import io
+import re
+import asyncio
+import logging
 import discord
 from discord.ext import commands
 import os
+from collections import OrderedDict
+
+log = logging.getLogger(__name__)
 
 
 DEATH_CHANNEL_ID = int(os.getenv('DEATH_CHANNEL_ID', '1436031058469716058'))
+# Display names kept for obituary titles; least recently used dropped first.
+USER_CACHE_SIZE = 1024
+# Deaths logged within this many seconds of each other share one commit.
+FLUSH_DELAY = 0.05
+# Seconds before a batch whose write failed is tried again, and how many
+# tries it gets before its rows are dropped.
+RETRY_DELAY = 5
+WRITE_ATTEMPTS = 5
+# Most recent deaths listed in a user's obituary.
+OBIT_SHOWN = 10
+
+_NON_DIGIT = re.compile(r'\D')
+
+# Discord caps a field value at 1024 characters and a whole embed at 6000, so
+# long death lists go into at most this many fields of whole lines.
+FIELD_CHARS = 1024
+MAX_FIELDS = 5
+
+# Statements run on every death/obit, kept as constants so each call passes
+# the identical string and hits sqlite3's prepared-statement cache.
+SQL_INSERT_DEATH = 'INSERT INTO death_log (user_id, cntr, reason) VALUES (?, ?, ?)'
+SQL_ALL_DEATHS = 'SELECT user_id, cntr, reason FROM death_log ORDER BY cntr'
+SQL_ANON_DEATHS = "SELECT cntr, reason FROM death_log WHERE user_id = '0' ORDER BY cntr"
+SQL_USER_DEATHS = ('SELECT cntr, reason, COUNT(*) OVER () AS total FROM death_log '
+                   'WHERE user_id = ? ORDER BY cntr DESC LIMIT ?')
+
+
+def _death_fields(entries):
+    """Split (cntr, line) pairs into (name, value) fields, keeping the newest."""
+    fields, chunk, size = [], [], 0
+    for cntr, line in entries:
+        line = line[:FIELD_CHARS]
+        if chunk and size + len(line) > FIELD_CHARS:
+            fields.append(chunk)
+            chunk, size = [], 0
+        chunk.append((cntr, line))
+        size += len(line) + 1
+    if chunk:
+        fields.append(chunk)
+    return [(f'#{c[0][0]} – #{c[-1][0]}', '\n'.join(line for _, line in c))
+            for c in fields[-MAX_FIELDS:]]
 
 
 class Grave(commands.Cog):
@@ -13,9 +60,85 @@ class Grave(commands.Cog):
 
     def __init__(self, bot):
         self.bot = bot
+        # user_id → display name, so repeat obituaries skip the fetch_user call.
+        self._names: OrderedDict[int, str] = OrderedDict()
+        # Death numbers are handed out from memory and the rows written in
+        # batches by _write_loop; None on the queue tells it to stop.
+        self._next_cntr = 1
+        self._writes: asyncio.Queue[tuple | None] = asyncio.Queue()
+        self._writer: asyncio.Task | None = None
+        self._channel: discord.TextChannel | None = None
+
+    async def cog_load(self):
+        async with self.bot.db.cursor() as cur:
+            await cur.execute('SELECT MAX(cntr) FROM death_log')
+            row = await cur.fetchone()
+        self._next_cntr = (row[0] or 0) + 1
+        self._writer = asyncio.create_task(self._write_loop())
+
+    async def cog_unload(self):
+        if self._writer is not None:
+            await self._writes.put(None)
+            await self._writer
+
+    async def _write_loop(self):
+        # Rows from a batch that failed to commit, written again with the next one.
+        failed: list[tuple] = []
+        attempts = 0
+        while True:
+            if failed:
+                # Retry on a timer instead of waiting for the next death.
+                await asyncio.sleep(RETRY_DELAY)
+                batch = []
+            else:
+                batch = [await self._writes.get()]
+                await asyncio.sleep(FLUSH_DELAY)
+            while not self._writes.empty():
+                batch.append(self._writes.get_nowait())
+            rows = failed + [r for r in batch if r is not None]
+            failed = []
+            if rows:
+                try:
+                    # A savepoint, not rollback(): bot.db is shared, and other
+                    # cogs may have uncommitted statements on it.
+                    async with self.bot.savepoint('death_log_write'):
+                        await self.bot.db.executemany(SQL_INSERT_DEATH, rows)
+                except Exception:
+                    attempts += 1
+                    if attempts < WRITE_ATTEMPTS:
+                        log.exception('Failed to write %d death_log rows, retrying', len(rows))
+                        failed = rows
+                    else:
+                        log.exception('Dropped %d death_log rows after %d failed writes', len(rows), attempts)
+                        attempts = 0
+                else:
+                    attempts = 0
+                    try:
+                        await self.bot.db.commit()
+                    except Exception:
+                        # The rows stay in the open transaction and go out with the next commit.
+                        log.exception('Failed to commit %d death_log rows', len(rows))
+            if None in batch:
+                if failed:
+                    log.error('Dropped %d unwritten death_log rows on unload', len(failed))
+                return
 
     def _death_channel(self):
-        return self.bot.get_channel(DEATH_CHANNEL_ID)
+        # Looked up until the guild cache has it, then kept.
+        if self._channel is None:
+            self._channel = self.bot.get_channel(DEATH_CHANNEL_ID)
+        return self._channel
+
+    async def _display_name(self, user_id: int) -> str:
+        name = self._names.get(user_id)
+        if name is not None:
+            self._names.move_to_end(user_id)
+            return name
+        user = self.bot.get_user(user_id) or await self.bot.fetch_user(user_id)
+        name = self._names[user_id] = str(user)
+        if len(self._names) > USER_CACHE_SIZE:
+            self._names.popitem(last=False)
+        return name
 
     # ── Helper: parse user id + reason from *args ─────────────────────────────
 
@@ -32,7 +155,7 @@ class Grave(commands.Cog):
             raw_id = str(ctx.author.id)
             reason = ' '.join(args)
 
-        digits = ''.join(ch for ch in raw_id if ch.isdigit())
+        digits = _NON_DIGIT.sub('', raw_id)
         user_id_str = digits if digits else ('0' if raw_id == '0' else str(ctx.author.id))
         return user_id_str, reason
 
@@ -54,26 +177,22 @@ class Grave(commands.Cog):
 
         user_id_str, reason = self._parse_args(ctx, args)
 
-        async with self.bot.db.cursor() as cur:
-            await cur.execute('SELECT MAX(cntr) FROM death_log')
-            row = await cur.fetchone()
-            num = (row[0] if row and row[0] is not None else 0) + 1
-            await cur.execute(
-                'INSERT INTO death_log (user_id, cntr, reason) VALUES (?, ?, ?)',
-                (user_id_str, num, reason),
-            )
-        await self.bot.db.commit()
+        # No await between reading and bumping the counter, so concurrent
+        # deaths can't be given the same number.
+        num = self._next_cntr
+        self._next_cntr += 1
+        self._writes.put_nowait((user_id_str, num, reason))
 
         if user_id_str == '0':
-            await ch.send(f'💀 **Death #{num}** — Anonymous\nReason: {reason or "Unknown cause."}')
-            await ctx.send('A soul has entered the graveyard anonymously.')
+            msg = f'💀 **Death #{num}** — Anonymous\nReason: {reason or "Unknown cause."}'
+            reply = 'A soul has entered the graveyard anonymously.'
         else:
             mention = f'<@{user_id_str}>'
             msg = f'💀 **Death #{num}** — {mention} has met a terrible fate.'
             if reason:
                 msg += f'\nReason: {reason}'
-            await ch.send(msg)
-            await ctx.send('A new soul has entered the graveyard.')
+            reply = 'A new soul has entered the graveyard.'
+        await asyncio.gather(ch.send(msg), ctx.send(reply))
 
     @commands.command(name='revive', aliases=['resurrect', 'undeath'])
     async def revive(self, ctx, *args):
@@ -112,59 +231,65 @@ class Grave(commands.Cog):
             target = str(ctx.author.id)
         else:
             first = args[0]
-            digits = ''.join(ch for ch in first if ch.isdigit())
+            digits = _NON_DIGIT.sub('', first)
             target = digits if digits else first  # allows '-1' or '0'
 
         async with self.bot.db.cursor() as cur:
             # Full log export
             if target == '-1':
-                await cur.execute('SELECT user_id, cntr, reason FROM death_log ORDER BY cntr')
-                rows = await cur.fetchall()
-                if not rows:
+                # Rows are encoded into the buffer as they are read rather than
+                # collected into a list and joined.
+                await cur.execute(SQL_ALL_DEATHS)
+                fp = io.BytesIO()
+                async for user_id, cntr, reason in cur:
+                    if fp.tell():
+                        fp.write(b'\n')
+                    fp.write(f'[{cntr}] ID: {user_id} | {reason or "No reason"}'.encode())
+                if not fp.tell():
                     return await ctx.send('The graveyard is empty.')
-                lines = [f'[{r["cntr"]}] ID: {r["user_id"]} | {r["reason"] or "No reason"}' for r in rows]
-                fp = io.BytesIO('\n'.join(lines).encode())
+                fp.seek(0)
                 return await ctx.send('📜 Full death log:', file=discord.File(fp, 'death_log.txt'))
 
             # Anonymous deaths
             elif target == '0':
-                await cur.execute("SELECT cntr, reason FROM death_log WHERE user_id = '0' ORDER BY cntr")
+                await cur.execute(SQL_ANON_DEATHS)
                 rows = await cur.fetchall()
                 if not rows:
                     return await ctx.send('No anonymous deaths.')
-                lines = [f'**{r["cntr"]}** — {r["reason"] or "No reason"}' for r in rows]
-                embed = discord.Embed(title='💀 Anonymous Deaths', description='\n'.join(lines),
-                                      color=discord.Color.dark_red())
+                embed = discord.Embed(title='💀 Anonymous Deaths', color=discord.Color.dark_red())
+                for name, value in _death_fields(
+                    (r['cntr'], f'**{r["cntr"]}** — {r["reason"] or "No reason"}') for r in rows
+                ):
+                    embed.add_field(name=name, value=value, inline=False)
                 embed.set_footer(text=f'Total: {len(rows)}')
-                return await ctx.send(embed=embed)
+                return await self.bot.with_backoff(lambda: ctx.send(embed=embed))
 
             # User obituary
             else:
-                await cur.execute(
-                    'SELECT cntr, reason FROM death_log WHERE user_id = ? ORDER BY cntr DESC',
-                    (target,),
-                )
+                # Only the newest OBIT_SHOWN rows come back; the window count
+                # still covers every death for the total.
+                await cur.execute(SQL_USER_DEATHS, (target, OBIT_SHOWN))
                 rows = await cur.fetchall()
 
         if not rows:
             return await ctx.send("They haven't died yet… keep trying! 😉")
 
         try:
-            u = await self.bot.fetch_user(int(target))
-            display = str(u)
+            display = await self._display_name(int(target))
         except Exception:
             display = f'ID {target}'
 
-        lines = [f'**{r["cntr"]}** — {r["reason"] or "Rest in peace :("}' for r in rows[:10]]
+        total = rows[0]['total']
+        lines = [f'**{r["cntr"]}** — {r["reason"] or "Rest in peace :("}' for r in rows]
         embed = discord.Embed(
             title=f'💀 Obituary — {display}',
             description='\n'.join(lines),
             color=discord.Color.red(),
         )
-        embed.set_footer(text=f'Total deaths: {len(rows)}. Showing last {len(rows[:10])}.')
-        await ctx.send(embed=embed)
+        embed.set_footer(text=f'Total deaths: {total}. Showing last {len(rows)}.')
+        await self.bot.with_backoff(lambda: ctx.send(embed=embed))
 
-        if len(rows) >= 100:
+        if total >= 100:
             await ctx.send('That is a lot of deaths… 🤯')
 
 
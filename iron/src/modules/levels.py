@@ -1,12 +1,30 @@
 """modules/levels.py – XP / levelling system (Cog version)."""
+import asyncio
+import contextlib
+import json
 import random
+import logging
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 import os
+from collections import defaultdict
+from functools import lru_cache
+
+log = logging.getLogger(__name__)
 
 LEVEL_UP_CHANNEL_ID = int(os.getenv('LEVEL_UP_CHANNEL_ID', '1433244417367605318'))
+# XP earned from chat is held in memory and written this often (seconds).
+XP_FLUSH_INTERVAL = 10
+
+SQL_ADD_XP = ('INSERT INTO levels (id, level, xp) VALUES (?, 1, ?) '
+              'ON CONFLICT(id) DO UPDATE SET xp = xp + excluded.xp')
+# Takes the ids as one JSON array so the statement text (and its cached plan)
+# is the same however many users are in the batch.
+SQL_LEVELS_FOR = 'SELECT id, level, xp FROM levels WHERE id IN (SELECT value FROM json_each(?))'
+SQL_SET_LEVEL = 'UPDATE levels SET level = ?, xp = ? WHERE id = ?'
 
 
+@lru_cache(maxsize=256)
 def _xp_needed(level: int) -> int:
     return int(10 * (1.5 ** (level - 1)))
 
@@ -16,34 +34,77 @@ class Levels(commands.Cog):
 
     def __init__(self, bot):
         self.bot = bot
+        # user_id → XP earned since the last flush.
+        self._pending_xp: defaultdict[int, int] = defaultdict(int)
+
+    async def cog_load(self):
+        self._flush_xp.start()
+
+    async def cog_unload(self):
+        # Wait for the cancel to land, so a write it interrupted has put its
+        # batch back before the final flush below.
+        task = self._flush_xp.get_task()
+        self._flush_xp.cancel()
+        if task is not None:
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        # Write out whatever was earned since the last tick.
+        try:
+            await self._write_xp()
+        except Exception:
+            log.exception('Failed to flush XP on unload')
 
     # ── XP engine ─────────────────────────────────────────────────────────────
 
-    async def _add_xp(self, user_id: int, amount: int):
-        async with self.bot.db.cursor() as cur:
-            await cur.execute('INSERT OR IGNORE INTO levels (id, level, xp) VALUES (?, 1, 0)', (user_id,))
-            await cur.execute('UPDATE levels SET xp = xp + ? WHERE id = ?', (amount, user_id))
-            await cur.execute('SELECT level, xp FROM levels WHERE id = ?', (user_id,))
-            row = await cur.fetchone()
-            level, xp = row['level'], row['xp']
+    def _add_xp(self, user_id: int, amount: int):
+        self._pending_xp[user_id] += amount
 
-            levelled_up = False
-            while xp >= _xp_needed(level):
-                xp   -= _xp_needed(level)
-                level += 1
-                levelled_up = True
-
-            if levelled_up:
-                await cur.execute('UPDATE levels SET level = ?, xp = ? WHERE id = ?', (level, xp, user_id))
+    async def _write_xp(self):
+        if not self._pending_xp:
+            return
+        # Swapped out before the first await, so XP earned during the write
+        # lands in the next batch.
+        pending, self._pending_xp = self._pending_xp, defaultdict(int)
+
+        levelled: list[tuple[int, int]] = []
+        try:
+            async with self.bot.savepoint('xp_write'), self.bot.db.cursor() as cur:
+                await cur.executemany(SQL_ADD_XP, pending.items())
+                await cur.execute(SQL_LEVELS_FOR, (json.dumps(list(pending)),))
+                updates = []
+                async for row in cur:
+                    level, xp = row['level'], row['xp']
+                    if xp < _xp_needed(level):
+                        continue
+                    while xp >= _xp_needed(level):
+                        xp   -= _xp_needed(level)
+                        level += 1
+                    updates.append((level, xp, row['id']))
+                    levelled.append((row['id'], level))
+                if updates:
+                    await cur.executemany(SQL_SET_LEVEL, updates)
+        except BaseException:
+            # The savepoint has undone the partial batch; put it back for the
+            # next flush. BaseException so a write cancelled by unload isn't lost.
+            for user_id, amount in pending.items():
+                self._pending_xp[user_id] += amount
+            raise
         await self.bot.db.commit()
 
-        if levelled_up:
-            ch = self.bot.get_channel(LEVEL_UP_CHANNEL_ID)
-            if ch:
+        ch = self.bot.get_channel(LEVEL_UP_CHANNEL_ID) if levelled else None
+        if ch:
+            for user_id, level in levelled:
                 user = self.bot.get_user(user_id)
                 mention = user.mention if user else f'<@{user_id}>'
                 await ch.send(f'🎉 {mention} levelled up to **Level {level}**!')
 
+    @tasks.loop(seconds=XP_FLUSH_INTERVAL)
+    async def _flush_xp(self):
+        try:
+            await self._write_xp()
+        except Exception:
+            log.exception('Failed to flush XP')
+
     # ── Events ────────────────────────────────────────────────────────────────
 
     @commands.Cog.listener()
@@ -54,7 +115,7 @@ class Levels(commands.Cog):
         ctx = await self.bot.get_context(message)
         if ctx.valid:
             return
-        await self._add_xp(message.author.id, random.randint(1, 3))
+        self._add_xp(message.author.id, random.randint(1, 3))
 
     # ── Commands ──────────────────────────────────────────────────────────────
 
@@ -1,6 +1,7 @@
 """modules/minecraft.py – Minecraft server status (Cog version)."""
 import os
 import re
+import time
 import asyncio
 import discord
 from discord.ext import commands, tasks
@@ -9,6 +10,8 @@ from mcstatus import JavaServer
 MINECRAFT_IP   = os.getenv('MINECRAFT_SERVER_IP', '')
 MINECRAFT_PORT = int(os.getenv('MINECRAFT_SERVER_PORT', '25565'))
 VOICE_CHANNEL  = os.getenv('VOICE_CHANNEL', '')
+# Seconds a status probe is reused for before the server is asked again.
+STATUS_TTL     = 20
 
 
 class Minecraft(commands.Cog):
@@ -16,6 +19,13 @@ class Minecraft(commands.Cog):
 
     def __init__(self, bot):
         self.bot = bot
+        # Last probe result; the lock makes concurrent callers share one probe.
+        self._status: dict | None = None
+        self._status_at = 0.0
+        self._status_lock = asyncio.Lock()
+        # Resolved once and reused; dropped after a failed probe so a DNS or
+        # address change is picked up on the next one.
+        self._server: JavaServer | None = None
         if VOICE_CHANNEL:
             self.update_vc.start()
 
@@ -23,9 +33,17 @@ class Minecraft(commands.Cog):
         self.update_vc.cancel()
 
     async def _get_status(self) -> dict:
+        async with self._status_lock:
+            if self._status is None or time.monotonic() - self._status_at >= STATUS_TTL:
+                self._status = await self._query_status()
+                self._status_at = time.monotonic()
+            return self._status
+
+    async def _query_status(self) -> dict:
         try:
-            server = JavaServer.lookup(f'{MINECRAFT_IP}:{MINECRAFT_PORT}')
-            st = await asyncio.to_thread(server.status)
+            if self._server is None:
+                self._server = await asyncio.to_thread(JavaServer.lookup, f'{MINECRAFT_IP}:{MINECRAFT_PORT}')
+            st = await asyncio.to_thread(self._server.status)
             return {
                 'online': True,
                 'players_online': st.players.online,
@@ -36,6 +54,7 @@ class Minecraft(commands.Cog):
                 'motd': str(st.description),
             }
         except Exception as exc:
+            self._server = None
             return {'online': False, 'error': str(exc)}
 
     @tasks.loop(minutes=5)
@@ -52,7 +71,7 @@ class Minecraft(commands.Cog):
                         if st['online'] else 'Server: Offline')
 
             if ch.name != new_name:
-                await ch.edit(name=new_name)
+                await self.bot.with_backoff(lambda: ch.edit(name=new_name))
         except discord.HTTPException as exc:
             if exc.status not in (403, 429):
                 raise
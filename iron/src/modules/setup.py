@@ -8,6 +8,13 @@ from discord import ui
 import pytz
 
 
+def _invalidate_location(bot, guild_id):
+    """Drop the Weather cog's cached default location after it is written."""
+    weather = bot.get_cog('Weather')
+    if weather is not None:
+        weather.invalidate(guild_id)
+
+
 # ─── Modals ──────────────────────────────────────────────────────────────────
 
 class SettingsModal(ui.Modal, title='Iron Bot – Server Settings'):
@@ -74,6 +81,7 @@ class SettingsModal(ui.Modal, title='Iron Bot – Server Settings'):
                 (self.guild_id, time_val, tz_val, loc_val or None),
             )
         await self.bot.db.commit()
+        _invalidate_location(self.bot, self.guild_id)
 
         embed = discord.Embed(
             title='✅ Settings Saved',
@@ -229,6 +237,7 @@ class Setup(commands.Cog):
                 (ctx.guild.id, location),
             )
         await self.bot.db.commit()
+        _invalidate_location(self.bot, ctx.guild.id)
         await ctx.send(f'✅ Weather location set to **{location}**')
 
     @setup.command(name='timezone')
@@ -17,9 +17,15 @@ import logging
 import time
 from datetime import datetime, timezone, timedelta
 
+import charts
+
 log = logging.getLogger(__name__)
 
 
+# Rank markers for the top-10 leaderboards.
+_MEDALS = ('🥇', '🥈', '🥉') + ('🏅',) * 7
+
+
 def _fmt_duration(seconds: int) -> str:
     """Format a number of seconds as a compact human-readable duration."""
     seconds = int(seconds)
@@ -47,60 +53,20 @@ def _level_total_xp(level: int, xp: int) -> int:
     return sum(_xp_needed(l) for l in range(1, level)) + xp
 
 
-def _requires_matplotlib():
-    try:
-        import matplotlib
-        return True
-    except ImportError:
-        return False
-
-
-async def _gen_chart(labels, tasks_done, on_time, title: str) -> io.BytesIO:
-    """Generate a bar chart and return it as a BytesIO PNG."""
-    def _draw():
-        import matplotlib
-        matplotlib.use('Agg')
-        import matplotlib.pyplot as plt
-        import numpy as np
-
-        x = np.arange(len(labels))
-        width = 0.35
-
-        fig, ax = plt.subplots(figsize=(10, 5), facecolor='#2b2d31')
-        ax.set_facecolor('#2b2d31')
-
-        bars1 = ax.bar(x - width / 2, tasks_done, width, label='Completed', color='#5865F2', zorder=3)
-        bars2 = ax.bar(x + width / 2, on_time, width, label='On Time', color='#57F287', zorder=3)
-
-        ax.set_xlabel('Date', color='white')
-        ax.set_ylabel('Tasks', color='white')
-        ax.set_title(title, color='white', fontsize=14, fontweight='bold')
-        ax.set_xticks(x)
-        ax.set_xticklabels(labels, rotation=45, ha='right', color='white', fontsize=8)
-        ax.tick_params(colors='white')
-        ax.spines[:].set_color('#40444b')
-        ax.yaxis.grid(True, color='#40444b', zorder=0)
-        ax.legend(facecolor='#40444b', labelcolor='white')
-
-        for bar in bars1:
-            h = bar.get_height()
-            if h:
-                ax.text(bar.get_x() + bar.get_width() / 2, h + 0.05, str(int(h)),
-                        ha='center', va='bottom', color='white', fontsize=8)
-        for bar in bars2:
-            h = bar.get_height()
-            if h:
-                ax.text(bar.get_x() + bar.get_width() / 2, h + 0.05, str(int(h)),
-                        ha='center', va='bottom', color='white', fontsize=8)
-
-        plt.tight_layout()
-        buf = io.BytesIO()
-        plt.savefig(buf, format='png', dpi=120, bbox_inches='tight', facecolor=fig.get_facecolor())
-        plt.close(fig)
-        buf.seek(0)
-        return buf
-
-    return await asyncio.to_thread(_draw)
+def _split_rows(rows):
+    """Split non-empty task_stats rows into (MM-DD labels, completed, on-time) in one pass."""
+    return map(list, zip(*((d[5:], c, o) for d, c, o, *_ in rows)))
+
+
+async def _gen_chart(pool, labels, tasks_done, on_time, title: str) -> io.BytesIO:
+    """Generate a bar chart and return it as an in-memory PNG.
+
+    matplotlib's draw path is CPU-bound and holds the GIL, so rendering runs on
+    the bot's process pool; only the series and the finished PNG cross over.
+    """
+    loop = asyncio.get_running_loop()
+    png = await loop.run_in_executor(pool, charts.draw_completion_chart, labels, tasks_done, on_time, title)
+    return io.BytesIO(png)
 
 
 class Stats(commands.Cog):
@@ -113,6 +79,8 @@ class Stats(commands.Cog):
         self._voice_sessions: dict[tuple[int, int], float] = {}
 
     async def cog_load(self):
+        self._mpl_probe = asyncio.create_task(asyncio.to_thread(charts.probe_matplotlib))
+
         # Seed sessions for anyone already in a voice channel when the cog loads.
         now = time.monotonic()
         for guild in self.bot.guilds:
@@ -127,6 +95,10 @@ class Stats(commands.Cog):
         # Persist whatever voice time has accrued so a reload/shutdown keeps it.
         await self._flush_voice_sessions()
 
+    async def _matplotlib_ready(self) -> bool:
+        await self._mpl_probe  # returns immediately once the startup probe is done
+        return charts.has_matplotlib()
+
     # ── Activity tracking ─────────────────────────────────────────────────────
 
     async def _add_messages(self, user_id: int, guild_id: int, amount: int = 1):
@@ -241,12 +213,24 @@ class Stats(commands.Cog):
         """View your productivity stats and graph."""
         rows = await self._get_stats(ctx.author.id, ctx.guild.id, 14)
 
-        total_done  = sum(r['tasks_completed'] for r in rows)
-        total_ot    = sum(r['tasks_on_time'] for r in rows)
-        total_late  = sum(r['tasks_late'] for r in rows)
-        total_asgn  = sum(r['assignments_completed'] for r in rows)
+        # One pass over the rows; Row unpacks positionally in _get_stats column order.
+        total_done = total_ot = total_late = total_asgn = 0
+        for _, c, o, l, a in rows:
+            total_done += c
+            total_ot   += o
+            total_late += l
+            total_asgn += a
         rate = round(total_ot / total_done * 100, 1) if total_done else 0
 
+        # Start rendering the chart now so it overlaps with the queries below.
+        chart_task = None
+        if rows and await self._matplotlib_ready():
+            labels, done, ot = _split_rows(rows)
+            chart_task = asyncio.create_task(
+                _gen_chart(self.bot.chart_pool, labels, done, ot,
+                           f'{ctx.author.display_name} — Task Completion (14 days)')
+            )
+
         # Pending counts
         async with self.bot.db.cursor() as cur:
             await cur.execute(
@@ -286,16 +270,12 @@ class Stats(commands.Cog):
             embed.set_footer(text='Complete tasks with !task done to start tracking stats.')
             return await ctx.send(embed=embed)
 
-        if not _requires_matplotlib():
+        if chart_task is None:
             embed.set_footer(text='Install matplotlib for charts: pip install matplotlib')
             return await ctx.send(embed=embed)
 
-        labels = [r['date'][5:] for r in rows]  # MM-DD
-        done   = [r['tasks_completed'] for r in rows]
-        ot     = [r['tasks_on_time'] for r in rows]
-
         async with ctx.typing():
-            buf = await _gen_chart(labels, done, ot, f'{ctx.author.display_name} — Task Completion (14 days)')
+            buf = await chart_task
 
         file = discord.File(buf, filename='stats.png')
         embed.set_image(url='attachment://stats.png')
@@ -308,15 +288,14 @@ class Stats(commands.Cog):
         if not rows:
             return await ctx.send('No stats data for the last 7 days. Complete some tasks first!')
 
-        if not _requires_matplotlib():
+        if not await self._matplotlib_ready():
             return await ctx.send('Install matplotlib for charts: `pip install matplotlib`')
 
-        labels = [r['date'][5:] for r in rows]
-        done   = [r['tasks_completed'] for r in rows]
-        ot     = [r['tasks_on_time'] for r in rows]
+        labels, done, ot = _split_rows(rows)
 
         async with ctx.typing():
-            buf = await _gen_chart(labels, done, ot, f'{ctx.author.display_name} — Last 7 Days')
+            buf = await _gen_chart(self.bot.chart_pool, labels, done, ot,
+                                   f'{ctx.author.display_name} — Last 7 Days')
 
         embed = discord.Embed(title='📊 7-Day Task Stats', color=0x1ABC9C)
         embed.set_image(url='attachment://stats.png')
@@ -329,15 +308,14 @@ class Stats(commands.Cog):
         if not rows:
             return await ctx.send('No stats data for the last 30 days.')
 
-        if not _requires_matplotlib():
+        if not await self._matplotlib_ready():
             return await ctx.send('Install matplotlib for charts: `pip install matplotlib`')
 
-        labels = [r['date'][5:] for r in rows]
-        done   = [r['tasks_completed'] for r in rows]
-        ot     = [r['tasks_on_time'] for r in rows]
+        labels, done, ot = _split_rows(rows)
 
         async with ctx.typing():
-            buf = await _gen_chart(labels, done, ot, f'{ctx.author.display_name} — Last 30 Days')
+            buf = await _gen_chart(self.bot.chart_pool, labels, done, ot,
+                                   f'{ctx.author.display_name} — Last 30 Days')
 
         embed = discord.Embed(title='📊 30-Day Task Stats', color=0x1ABC9C)
         embed.set_image(url='attachment://stats.png')
@@ -360,12 +338,11 @@ class Stats(commands.Cog):
             )
             rows = await cur.fetchall()
 
-        medals = ['🥇', '🥈', '🥉'] + ['🏅'] * 7
         if rows:
-            lines = [f'{medals[i]} **{self._member_name(guild, r["id"])}** '
-                     f'— Level {r["level"]} ({_level_total_xp(r["level"], r["xp"]):,} XP)'
-                     for i, r in enumerate(rows)]
-            desc = '\n'.join(lines)
+            desc = '\n'.join(
+                f'{medal} **{self._member_name(guild, r["id"])}** '
+                f'— Level {r["level"]} ({_level_total_xp(r["level"], r["xp"]):,} XP)'
+                for medal, r in zip(_MEDALS, rows))
         else:
             desc = 'No one has earned XP yet.'
         return discord.Embed(title='⚡ Level Leaderboard',
@@ -378,11 +355,10 @@ class Stats(commands.Cog):
             )
             rows = await cur.fetchall()
 
-        medals = ['🥇', '🥈', '🥉'] + ['🏅'] * 7
         if rows:
-            lines = [f'{medals[i]} **{self._member_name(guild, r["user_id"])}** '
-                     f'— {r["balance"]:,} coins' for i, r in enumerate(rows)]
-            desc = '\n'.join(lines)
+            desc = '\n'.join(
+                f'{medal} **{self._member_name(guild, r["user_id"])}** — {r["balance"]:,} coins'
+                for medal, r in zip(_MEDALS, rows))
         else:
             desc = 'No balances recorded yet.'
         return discord.Embed(title='💰 Wealth Leaderboard',
@@ -405,14 +381,11 @@ class Stats(commands.Cog):
             )
             rows = await cur.fetchall()
 
-        medals = ['🥇', '🥈', '🥉'] + ['🏅'] * 7
         if rows:
-            lines = []
-            for i, r in enumerate(rows):
-                rate = round(r['ot'] / r['done'] * 100) if r['done'] else 0
-                lines.append(f'{medals[i]} **{self._member_name(guild, r["user_id"])}** '
-                             f'— {r["done"]} tasks ({rate}% on time)')
-            desc = '\n'.join(lines)
+            desc = '\n'.join(
+                f'{medal} **{self._member_name(guild, r["user_id"])}** '
+                f'— {r["done"]} tasks ({round(r["ot"] / r["done"] * 100)}% on time)'  # done > 0 via HAVING
+                for medal, r in zip(_MEDALS, rows))
         else:
             desc = 'No task data for this server yet.'
         return discord.Embed(title='🏆 Task Leaderboard — Last 30 Days',
@@ -428,11 +401,10 @@ class Stats(commands.Cog):
             )
             rows = await cur.fetchall()
 
-        medals = ['🥇', '🥈', '🥉'] + ['🏅'] * 7
         if rows:
-            lines = [f'{medals[i]} **{self._member_name(guild, r["user_id"])}** '
-                     f'— {r["messages"]:,} messages' for i, r in enumerate(rows)]
-            desc = '\n'.join(lines)
+            desc = '\n'.join(
+                f'{medal} **{self._member_name(guild, r["user_id"])}** — {r["messages"]:,} messages'
+                for medal, r in zip(_MEDALS, rows))
         else:
             desc = 'No message activity tracked yet.'
         return discord.Embed(title='💬 Message Leaderboard',
@@ -450,11 +422,10 @@ class Stats(commands.Cog):
             )
             rows = await cur.fetchall()
 
-        medals = ['🥇', '🥈', '🥉'] + ['🏅'] * 7
         if rows:
-            lines = [f'{medals[i]} **{self._member_name(guild, r["user_id"])}** '
-                     f'— {_fmt_duration(r["voice_seconds"])}' for i, r in enumerate(rows)]
-            desc = '\n'.join(lines)
+            desc = '\n'.join(
+                f'{medal} **{self._member_name(guild, r["user_id"])}** — {_fmt_duration(r["voice_seconds"])}'
+                for medal, r in zip(_MEDALS, rows))
         else:
             desc = 'No voice activity tracked yet.'
         return discord.Embed(title='🎙️ Voice Leaderboard',
@@ -16,7 +16,38 @@ Usage
 import discord
 from discord.ext import commands
 from discord import ui
+from collections import OrderedDict
+from functools import partial
 from datetime import datetime, timezone
+import logging
+import sqlite3
+
+log = logging.getLogger(__name__)
+
+# Max number of tag rows kept in the per-process lookup cache.
+TAG_CACHE_SIZE = 1024
+
+# Trigram full-text index over tag names, kept in sync with `tags` by triggers.
+# Trigram matching needs at least three characters; shorter searches fall back
+# to a LIKE scan.
+FTS_SCHEMA = [
+    '''CREATE VIRTUAL TABLE IF NOT EXISTS tags_fts
+       USING fts5(name, content='tags', content_rowid='id', tokenize='trigram')''',
+    '''CREATE TRIGGER IF NOT EXISTS tags_fts_ai AFTER INSERT ON tags BEGIN
+           INSERT INTO tags_fts (rowid, name) VALUES (new.id, new.name);
+       END''',
+    '''CREATE TRIGGER IF NOT EXISTS tags_fts_ad AFTER DELETE ON tags BEGIN
+           INSERT INTO tags_fts (tags_fts, rowid, name) VALUES ('delete', old.id, old.name);
+       END''',
+    '''CREATE TRIGGER IF NOT EXISTS tags_fts_au AFTER UPDATE OF name ON tags BEGIN
+           INSERT INTO tags_fts (tags_fts, rowid, name) VALUES ('delete', old.id, old.name);
+           INSERT INTO tags_fts (rowid, name) VALUES (new.id, new.name);
+       END''',
+]
+FTS_MIN_QUERY = 3
+
+TAGS_PER_PAGE = 15
+PAGE_CACHE_SIZE = 3
 
 
 # ─── Modals ───────────────────────────────────────────────────────────────────
@@ -48,6 +79,7 @@ class TagCreateModal(ui.Modal, title='Create Tag'):
             return await interaction.response.send_message(
                 f'❌ A tag named `{name}` already exists in this server.', ephemeral=True
             )
+        _invalidate_tag(self.bot, self.guild_id, name)
 
         embed = discord.Embed(
             title='🏷️ Tag Created',
@@ -75,6 +107,7 @@ class TagEditModal(ui.Modal, title='Edit Tag'):
                 (new_content, self.tag_id),
             )
         await self.bot.db.commit()
+        _invalidate_tag(self.bot, interaction.guild_id, self.tag_name)
         await interaction.response.send_message(
             embed=discord.Embed(description=f'✅ Tag **{self.tag_name}** updated.', color=0x57F287),
             ephemeral=True,
@@ -83,38 +116,76 @@ class TagEditModal(ui.Modal, title='Edit Tag'):
 
 # ─── Helpers ─────────────────────────────────────────────────────────────────
 
-def chunk_pages(items, title, color, per_page=15):
-    pages = []
-    for i in range(0, max(len(items), 1), per_page):
-        chunk = items[i:i + per_page]
-        embed = discord.Embed(title=title, color=color)
-        embed.description = '\n'.join(chunk) if chunk else '*No tags yet.*'
-        embed.set_footer(text=f'Page {i // per_page + 1} of {max(1, (len(items) - 1) // per_page + 1)} '
-                              f'• Total: {len(items)}')
-        pages.append(embed)
-    return pages
+def _invalidate_tag(bot, guild_id, name):
+    """Drop a cached tag row after it has been written to."""
+    cog = bot.get_cog('Tags')
+    if cog is not None:
+        cog._tag_cache.pop((guild_id, name.strip().lower()), None)
+
+
+def _fmt_tag(row):
+    return f'`{row["name"]}` — {row["uses"]} use(s)'
+
+
+def page_embed(lines, title, color, page, total, per_page=TAGS_PER_PAGE):
+    """Build the embed for one page of tag lines."""
+    embed = discord.Embed(title=title, color=color)
+    embed.description = '\n'.join(lines) if lines else '*No tags yet.*'
+    embed.set_footer(text=f'Page {page + 1} of {max(1, (total - 1) // per_page + 1)} '
+                          f'• Total: {total}')
+    return embed
 
 
 class Paginator(ui.View):
-    def __init__(self, embeds):
+    """Pages through a query, fetching each page from the database on demand."""
+
+    def __init__(self, fetch, title, color, total, per_page=TAGS_PER_PAGE):
         super().__init__(timeout=120)
-        self.embeds = embeds
+        self.fetch = fetch  # async (page) -> list[str]
+        self.title = title
+        self.color = color
+        self.total = total
+        self.per_page = per_page
         self.page = 0
+        # page -> embed, least recently shown first; makes quick ◀/▶ flips free.
+        self._embeds: OrderedDict[int, discord.Embed] = OrderedDict()
         self._upd()
 
+    @property
+    def page_count(self):
+        return max(1, (self.total - 1) // self.per_page + 1)
+
     def _upd(self):
         self.prev.disabled = self.page == 0
-        self.next.disabled = self.page == len(self.embeds) - 1
+        self.next.disabled = self.page == self.page_count - 1
+
+    async def _build_embed(self, page):
+        """Build (or reuse) the embed for one page, keeping the last few around."""
+        embed = self._embeds.get(page)
+        if embed is None:
+            lines = await self.fetch(page)
+            embed = page_embed(lines, self.title, self.color, page, self.total, self.per_page)
+            self._embeds[page] = embed
+            if len(self._embeds) > PAGE_CACHE_SIZE:
+                self._embeds.popitem(last=False)
+        else:
+            self._embeds.move_to_end(page)
+        return embed
+
+    async def _show(self, interaction: discord.Interaction):
+        self._upd()
+        embed = await self._build_embed(self.page)
+        await interaction.response.edit_message(embed=embed, view=self)
 
     @ui.button(label='◀', style=discord.ButtonStyle.secondary)
     async def prev(self, interaction: discord.Interaction, button: ui.Button):
-        self.page -= 1; self._upd()
-        await interaction.response.edit_message(embed=self.embeds[self.page], view=self)
+        self.page -= 1
+        await self._show(interaction)
 
     @ui.button(label='▶', style=discord.ButtonStyle.secondary)
     async def next(self, interaction: discord.Interaction, button: ui.Button):
-        self.page += 1; self._upd()
-        await interaction.response.edit_message(embed=self.embeds[self.page], view=self)
+        self.page += 1
+        await self._show(interaction)
 
 
 # ─── Cog ─────────────────────────────────────────────────────────────────────
@@ -124,14 +195,47 @@ class Tags(commands.Cog):
 
     def __init__(self, bot):
         self.bot = bot
+        # (guild_id, name) -> tag row as a dict, least recently used first.
+        self._tag_cache: OrderedDict[tuple[int, str], dict] = OrderedDict()
+        self._fts = False
+
+    async def cog_load(self):
+        # FTS5 / the trigram tokenizer depend on how SQLite was built, so
+        # searching degrades to LIKE rather than failing when unavailable.
+        try:
+            async with self.bot.db.cursor() as cur:
+                await cur.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'tags_fts'"
+                )
+                existed = await cur.fetchone() is not None
+                for sql in FTS_SCHEMA:
+                    await cur.execute(sql)
+                if not existed:
+                    await cur.execute("INSERT INTO tags_fts (tags_fts) VALUES ('rebuild')")
+            await self.bot.db.commit()
+            self._fts = True
+        except sqlite3.OperationalError as exc:
+            log.warning('Tag full-text search unavailable, using LIKE: %s', exc)
 
     async def _get_tag(self, guild_id, name):
+        key = (guild_id, name.strip().lower())
+        row = self._tag_cache.get(key)
+        if row is not None:
+            self._tag_cache.move_to_end(key)
+            return row
         async with self.bot.db.cursor() as cur:
             await cur.execute(
                 'SELECT * FROM tags WHERE guild_id = ? AND name = ?',
-                (guild_id, name.strip().lower()),
+                key,
             )
-            return await cur.fetchone()
+            row = await cur.fetchone()
+        if row is None:
+            return None
+        row = dict(row)
+        self._tag_cache[key] = row
+        if len(self._tag_cache) > TAG_CACHE_SIZE:
+            self._tag_cache.popitem(last=False)
+        return row
 
     def _can_manage(self, ctx, tag_row) -> bool:
         """True if the user owns the tag or is an admin."""
@@ -140,6 +244,26 @@ class Tags(commands.Cog):
             or ctx.author.guild_permissions.administrator
         )
 
+    async def _count(self, sql, args) -> int:
+        async with self.bot.db.cursor() as cur:
+            await cur.execute(f'SELECT COUNT(*) FROM ({sql})', args)
+            return (await cur.fetchone())[0]
+
+    async def _fetch_page(self, sql, args, page, per_page=TAGS_PER_PAGE):
+        """Fetch one page of `name, uses` rows and format them as list lines."""
+        async with self.bot.db.cursor() as cur:
+            await cur.execute(f'{sql} LIMIT ? OFFSET ?', (*args, per_page, page * per_page))
+            rows = await cur.fetchall()
+        return list(map(_fmt_tag, rows))
+
+    async def _send_paged(self, ctx, sql, args, title, total):
+        """Send page 1 of a tag listing, attaching a Paginator if there are more."""
+        fetch = partial(self._fetch_page, sql, args)
+        if total <= TAGS_PER_PAGE:
+            return await ctx.send(embed=page_embed(await fetch(0), title, 0x57F287, 0, total))
+        view = Paginator(fetch, title, 0x57F287, total)
+        await ctx.send(embed=await view._build_embed(0), view=view)
+
     # ── Main tag group ────────────────────────────────────────────────────────
 
     @commands.group(name='tag', invoke_without_command=True)
@@ -154,6 +278,8 @@ class Tags(commands.Cog):
         async with self.bot.db.cursor() as cur:
             await cur.execute('UPDATE tags SET uses = uses + 1 WHERE id = ?', (row['id'],))
         await self.bot.db.commit()
+        # Keep the cached row's counter in step with the database.
+        row['uses'] += 1
         await ctx.send(row['content'])
 
     @tag.command(name='create', aliases=['add', 'new'])
@@ -186,6 +312,7 @@ class Tags(commands.Cog):
         async with self.bot.db.cursor() as cur:
             await cur.execute('DELETE FROM tags WHERE id = ?', (row['id'],))
         await self.bot.db.commit()
+        _invalidate_tag(self.bot, ctx.guild.id, row['name'])
         await ctx.send(
             embed=discord.Embed(description=f'🗑️ Tag **{name}** deleted.', color=discord.Color.red())
         )
@@ -217,40 +344,31 @@ class Tags(commands.Cog):
     @tag.command(name='list', aliases=['all'])
     async def tag_list(self, ctx):
         """List all tags in this server."""
-        async with self.bot.db.cursor() as cur:
-            await cur.execute(
-                'SELECT name, uses FROM tags WHERE guild_id = ? ORDER BY uses DESC',
-                (ctx.guild.id,),
-            )
-            rows = await cur.fetchall()
-        if not rows:
+        sql = 'SELECT name, uses FROM tags WHERE guild_id = ? ORDER BY uses DESC, name'
+        args = (ctx.guild.id,)
+        total = await self._count(sql, args)
+        if not total:
             return await ctx.send(
                 embed=discord.Embed(description='No tags in this server yet.', color=0x57F287)
             )
-        lines = [f'`{r["name"]}` — {r["uses"]} use(s)' for r in rows]
-        embeds = chunk_pages(lines, f'🏷️ Tags — {ctx.guild.name}', 0x57F287)
-        if len(embeds) == 1:
-            await ctx.send(embed=embeds[0])
-        else:
-            await ctx.send(embed=embeds[0], view=Paginator(embeds))
+        await self._send_paged(ctx, sql, args, f'🏷️ Tags — {ctx.guild.name}', total)
 
     @tag.command(name='search', aliases=['find'])
     async def tag_search(self, ctx, *, query: str):
         """Search tags by name."""
-        async with self.bot.db.cursor() as cur:
-            await cur.execute(
-                'SELECT name, uses FROM tags WHERE guild_id = ? AND name LIKE ? ORDER BY uses DESC',
-                (ctx.guild.id, f'%{query.lower()}%'),
-            )
-            rows = await cur.fetchall()
-        if not rows:
-            return await ctx.send(f'No tags matching `{query}` found.')
-        lines = [f'`{r["name"]}` — {r["uses"]} use(s)' for r in rows]
-        embeds = chunk_pages(lines, f'🔍 Tag Search: {query}', 0x57F287)
-        if len(embeds) == 1:
-            await ctx.send(embed=embeds[0])
+        if self._fts and len(query) >= FTS_MIN_QUERY:
+            sql = '''SELECT t.name, t.uses FROM tags_fts
+                     JOIN tags t ON t.id = tags_fts.rowid
+                     WHERE tags_fts MATCH ? AND t.guild_id = ?
+                     ORDER BY t.uses DESC, t.name'''
+            args = ('"' + query.replace('"', '""') + '"', ctx.guild.id)
         else:
-            await ctx.send(embed=embeds[0], view=Paginator(embeds))
+            sql = 'SELECT name, uses FROM tags WHERE guild_id = ? AND name LIKE ? ORDER BY uses DESC, name'
+            args = (ctx.guild.id, f'%{query.lower()}%')
+        total = await self._count(sql, args)
+        if not total:
+            return await ctx.send(f'No tags matching `{query}` found.')
+        await self._send_paged(ctx, sql, args, f'🔍 Tag Search: {query}', total)
 
     @tag.command(name='transfer')
     async def tag_transfer(self, ctx, name: str, new_owner: discord.Member):
@@ -263,6 +381,7 @@ class Tags(commands.Cog):
         async with self.bot.db.cursor() as cur:
             await cur.execute('UPDATE tags SET owner_id = ? WHERE id = ?', (new_owner.id, row['id']))
         await self.bot.db.commit()
+        _invalidate_tag(self.bot, ctx.guild.id, row['name'])
         await ctx.send(
             embed=discord.Embed(
                 description=f'✅ Tag **{name}** transferred to {new_owner.mention}.',
@@ -273,20 +392,12 @@ class Tags(commands.Cog):
     @tag.command(name='mine')
     async def tag_mine(self, ctx):
         """List tags you own."""
-        async with self.bot.db.cursor() as cur:
-            await cur.execute(
-                'SELECT name, uses FROM tags WHERE guild_id = ? AND owner_id = ? ORDER BY name',
-                (ctx.guild.id, ctx.author.id),
-            )
-            rows = await cur.fetchall()
-        if not rows:
+        sql = 'SELECT name, uses FROM tags WHERE guild_id = ? AND owner_id = ? ORDER BY name'
+        args = (ctx.guild.id, ctx.author.id)
+        total = await self._count(sql, args)
+        if not total:
             return await ctx.send('You have no tags in this server.')
-        lines = [f'`{r["name"]}` — {r["uses"]} use(s)' for r in rows]
-        embeds = chunk_pages(lines, '🏷️ Your Tags', 0x57F287)
-        if len(embeds) == 1:
-            await ctx.send(embed=embeds[0])
-        else:
-            await ctx.send(embed=embeds[0], view=Paginator(embeds))
+        await self._send_paged(ctx, sql, args, '🏷️ Your Tags', total)
 
 
 # ─── Helper views ────────────────────────────────────────────────────────────
@@ -22,76 +22,202 @@ Assignments (class work)
 import discord
 from discord.ext import commands
 from discord import ui
-from datetime import datetime, timezone, timedelta
+import asyncio
+import functools
+import logging
+import sqlite3
+import time
+from collections import OrderedDict
+from datetime import date, datetime, timezone, timedelta
 from typing import Optional
 import pytz
 
+log = logging.getLogger(__name__)
+
+# Trigram full-text index over assignment course/title, kept in sync with
+# `assignments` by triggers. Trigram matching needs at least three characters;
+# shorter course filters fall back to a LIKE scan.
+FTS_SCHEMA = [
+    '''CREATE VIRTUAL TABLE IF NOT EXISTS assignments_fts
+       USING fts5(course, title, content='assignments', content_rowid='id', tokenize='trigram')''',
+    '''CREATE TRIGGER IF NOT EXISTS assignments_fts_ai AFTER INSERT ON assignments BEGIN
+           INSERT INTO assignments_fts (rowid, course, title) VALUES (new.id, new.course, new.title);
+       END''',
+    '''CREATE TRIGGER IF NOT EXISTS assignments_fts_ad AFTER DELETE ON assignments BEGIN
+           INSERT INTO assignments_fts (assignments_fts, rowid, course, title)
+           VALUES ('delete', old.id, old.course, old.title);
+       END''',
+    '''CREATE TRIGGER IF NOT EXISTS assignments_fts_au AFTER UPDATE OF course, title ON assignments BEGIN
+           INSERT INTO assignments_fts (assignments_fts, rowid, course, title)
+           VALUES ('delete', old.id, old.course, old.title);
+           INSERT INTO assignments_fts (rowid, course, title) VALUES (new.id, new.course, new.title);
+       END''',
+]
+FTS_MIN_QUERY = 3
+
+# Rendered list pages kept by Tasks, and how long one may be served for.
+LIST_CACHE_SIZE = 256
+LIST_CACHE_TTL = 600
+
 
 # ─── Helpers ─────────────────────────────────────────────────────────────────
 
 PRIORITY_EMOJI = {'high': '🔴', 'medium': '🟡', 'low': '🟢'}
 STATUS_EMOJI   = {'pending': '⬜', 'in_progress': '🔵', 'completed': '✅', 'submitted': '📤', 'graded': '📝'}
 
-def fmt_due(due_str: Optional[str]) -> str:
+def fmt_due(due_str: Optional[str], today_ord: Optional[int] = None) -> str:
+    """Format a due date with a relative suffix. Pass `today_ord` when formatting many rows."""
     if not due_str:
         return '*no due date*'
+    if today_ord is None:
+        today_ord = datetime.now().toordinal()
+    return _fmt_due(due_str, today_ord)
+
+
+_MONTHS = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
+           'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+
+
+@functools.lru_cache(maxsize=512)
+def _fmt_due(due_str: str, today_ord: int) -> str:
+    # Keyed on today's ordinal so the relative suffix rolls over at midnight.
+    # Due dates are stored as YYYY-MM-DD[...], so slice the fields rather than
+    # going through fromisoformat/strftime.
     try:
-        dt = datetime.fromisoformat(due_str)
-        now = datetime.now()
-        delta = (dt.date() - now.date()).days
-        suffix = ''
-        if delta < 0:
-            suffix = f' (**{abs(delta)}d overdue**)'
-        elif delta == 0:
-            suffix = ' (**today**)'
-        elif delta == 1:
-            suffix = ' (*tomorrow*)'
-        elif delta <= 7:
-            suffix = f' (*in {delta}d*)'
-        return dt.strftime('%b %d, %Y') + suffix
-    except Exception:
-        return due_str
-
-
-def chunk_embeds(items, title, color, per_page=8):
-    """Split a list of items into pages of Discord embeds."""
-    pages = []
-    for i in range(0, max(len(items), 1), per_page):
-        chunk = items[i:i + per_page]
-        embed = discord.Embed(title=title, color=color)
-        if not chunk:
-            embed.description = '*Nothing here.*'
-        else:
-            embed.description = '\n'.join(chunk)
-        embed.set_footer(text=f'Page {i // per_page + 1} of {max(1, (len(items) - 1) // per_page + 1)}')
-        pages.append(embed)
-    return pages
+        y, m, d = int(due_str[0:4]), int(due_str[5:7]), int(due_str[8:10])
+        due = date(y, m, d)
+    except ValueError:
+        # Rows saved before _normalize_due may hold other ISO forms, e.g. 20250501.
+        try:
+            due = datetime.fromisoformat(due_str).date()
+        except ValueError:
+            return due_str
+        y, m, d = due.year, due.month, due.day
+    delta = due.toordinal() - today_ord
+    suffix = ''
+    if delta < 0:
+        suffix = f' (**{-delta}d overdue**)'
+    elif delta == 0:
+        suffix = ' (**today**)'
+    elif delta == 1:
+        suffix = ' (*tomorrow*)'
+    elif delta <= 7:
+        suffix = f' (*in {delta}d*)'
+    return f'{_MONTHS[m - 1]} {d:02d}, {y}' + suffix
+
+
+def _normalize_due(due: str) -> str:
+    """Return an entered due date as YYYY-MM-DD[ HH:MM:SS], raising ValueError if invalid."""
+    # fmt_due and the due_ord column both read the date from the first ten characters.
+    try:
+        return date.fromisoformat(due).isoformat()
+    except ValueError:
+        return datetime.fromisoformat(due).isoformat(sep=' ')
+
+
+def page_embed(items, title, color, page, per_page=8):
+    """Build the embed for one page of a list of items."""
+    chunk = items[page * per_page:(page + 1) * per_page]
+    embed = discord.Embed(title=title, color=color)
+    if not chunk:
+        embed.description = '*Nothing here.*'
+    else:
+        embed.description = '\n'.join(chunk)
+    embed.set_footer(text=f'Page {page + 1} of {max(1, (len(items) - 1) // per_page + 1)}')
+    return embed
+
+
+def _task_lines(rows):
+    today_ord = datetime.now().toordinal()
+    pe, se = PRIORITY_EMOJI.get, STATUS_EMOJI.get
+    lines = []
+    # Rows unpack positionally in `SELECT id, title, priority, status, due_date` order.
+    for rid, title, prio, status, due_date in rows:
+        lines.append(f'{se(status, "⬜")} {pe(prio, "⬜")} **#{rid}** {title} — {fmt_due(due_date, today_ord)}')
+    return lines
+
+
+def _assign_lines(rows):
+    today_ord = datetime.now().toordinal()
+    se = STATUS_EMOJI.get
+    lines = []
+    # Rows unpack positionally in `SELECT id, course, title, status, due_date, points` order.
+    for aid, course, title, status, due_date, points in rows:
+        pts = f' [{points}pts]' if points else ''
+        lines.append(f'{se(status, "⬜")} **#{aid}** **{course}** – {title}{pts} — {fmt_due(due_date, today_ord)}')
+    return lines
+
+
+# Above this many rows, list formatting runs on a worker thread so a very long
+# list does not stall the gateway heartbeat.
+OFFLOAD_ROWS = 64
+
+
+async def _format_rows(formatter, rows):
+    if len(rows) > OFFLOAD_ROWS:
+        return await asyncio.to_thread(formatter, rows)
+    return formatter(rows)
+
+
+def _bump_version(bot, user_id, guild_id):
+    """Invalidate a user's cached list lines after their tasks/assignments change."""
+    cog = bot.get_cog('Tasks')
+    if cog is not None:
+        cog.bump_version(user_id, guild_id)
 
 
 # ─── Paginator View ──────────────────────────────────────────────────────────
 
 class Paginator(ui.View):
-    def __init__(self, embeds):
+    """Pages through list lines, building each page's embed the first time it is shown."""
+
+    def __init__(self, items, title, color, per_page=8):
         super().__init__(timeout=120)
-        self.embeds = embeds
+        self.items = items
+        self.title = title
+        self.color = color
+        self.per_page = per_page
+        self.page_count = max(1, (len(items) - 1) // per_page + 1)
         self.page = 0
+        self._pages: dict[int, discord.Embed] = {}
+        self._busy = False
         self._update()
 
+    def build(self, page):
+        embed = self._pages.get(page)
+        if embed is None:
+            embed = self._pages[page] = page_embed(self.items, self.title, self.color, page, self.per_page)
+        return embed
+
     def _update(self):
         self.prev_btn.disabled = self.page == 0
-        self.next_btn.disabled = self.page == len(self.embeds) - 1
+        self.next_btn.disabled = self.page == self.page_count - 1
+
+    def _prebuild(self, page):
+        if 0 <= page < self.page_count:
+            self.build(page)
+
+    async def _turn(self, interaction: discord.Interaction, step):
+        # Drop clicks that land while the previous edit is still in flight.
+        if self._busy:
+            return await interaction.response.defer()
+        self._busy = True
+        try:
+            self.page += step
+            self._update()
+            await interaction.response.edit_message(embed=self.build(self.page), view=self)
+        finally:
+            self._busy = False
+        # Build the next page in the same direction once the edit is out.
+        asyncio.get_running_loop().call_soon(self._prebuild, self.page + step)
 
     @ui.button(label='◀', style=discord.ButtonStyle.secondary)
     async def prev_btn(self, interaction: discord.Interaction, button: ui.Button):
-        self.page -= 1
-        self._update()
-        await interaction.response.edit_message(embed=self.embeds[self.page], view=self)
+        await self._turn(interaction, -1)
 
     @ui.button(label='▶', style=discord.ButtonStyle.secondary)
     async def next_btn(self, interaction: discord.Interaction, button: ui.Button):
-        self.page += 1
-        self._update()
-        await interaction.response.edit_message(embed=self.embeds[self.page], view=self)
+        await self._turn(interaction, 1)
 
 
 # ─── Task Modals ─────────────────────────────────────────────────────────────
@@ -119,7 +245,7 @@ class AddTaskModal(ui.Modal, title='Add Task'):
         due = str(self.due_date.value).strip() or None
         if due:
             try:
-                datetime.fromisoformat(due)
+                due = _normalize_due(due)
             except ValueError:
                 return await interaction.response.send_message('❌ Invalid date. Use YYYY-MM-DD.', ephemeral=True)
 
@@ -135,6 +261,7 @@ class AddTaskModal(ui.Modal, title='Add Task'):
             )
             task_id = cur.lastrowid
         await self.bot.db.commit()
+        _bump_version(self.bot, self.user_id, self.guild_id)
 
         embed = discord.Embed(
             title='✅ Task Added',
@@ -163,7 +290,7 @@ class AddAssignmentModal(ui.Modal, title='Add Assignment'):
     async def on_submit(self, interaction: discord.Interaction):
         due = str(self.due_date.value).strip()
         try:
-            datetime.fromisoformat(due)
+            due = _normalize_due(due)
         except ValueError:
             return await interaction.response.send_message('❌ Invalid date. Use YYYY-MM-DD.', ephemeral=True)
 
@@ -182,6 +309,7 @@ class AddAssignmentModal(ui.Modal, title='Add Assignment'):
             )
             aid = cur.lastrowid
         await self.bot.db.commit()
+        _bump_version(self.bot, self.user_id, self.guild_id)
 
         embed = discord.Embed(
             title='✅ Assignment Added',
@@ -202,6 +330,66 @@ class Tasks(commands.Cog):
 
     def __init__(self, bot):
         self.bot = bot
+        # (user_id, guild_id, kind, filter) -> (day, expiry, rendered lines), least
+        # recently used first. The day is kept because fmt_due output ("today",
+        # "in 3d") changes at midnight.
+        self._list_cache: OrderedDict[tuple, tuple[date, float, list[str]]] = OrderedDict()
+        self._fts = False
+
+    async def cog_load(self):
+        # FTS5 / the trigram tokenizer depend on how SQLite was built, so the
+        # course filter degrades to LIKE rather than failing when unavailable.
+        try:
+            async with self.bot.db.cursor() as cur:
+                await cur.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'assignments_fts'"
+                )
+                existed = await cur.fetchone() is not None
+                for sql in FTS_SCHEMA:
+                    await cur.execute(sql)
+                if not existed:
+                    await cur.execute("INSERT INTO assignments_fts (assignments_fts) VALUES ('rebuild')")
+            await self.bot.db.commit()
+            self._fts = True
+        except sqlite3.OperationalError as exc:
+            log.warning('Assignment full-text search unavailable, using LIKE: %s', exc)
+
+    def bump_version(self, user_id, guild_id):
+        """Drop a user's cached lists after their tasks/assignments change."""
+        for key in [k for k in self._list_cache if k[:2] == (user_id, guild_id)]:
+            del self._list_cache[key]
+
+    def _cached_lines(self, key):
+        hit = self._list_cache.get(key)
+        if hit is None:
+            return None
+        if hit[0] != date.today() or hit[1] < time.monotonic():
+            del self._list_cache[key]
+            return None
+        self._list_cache.move_to_end(key)
+        return hit[2]
+
+    def _store_lines(self, key, lines):
+        self._list_cache[key] = (date.today(), time.monotonic() + LIST_CACHE_TTL, lines)
+        self._list_cache.move_to_end(key)
+        while len(self._list_cache) > LIST_CACHE_SIZE:
+            self._list_cache.popitem(last=False)
+
+    async def _send_paged(self, ctx, lines, title, color):
+        """Send page 1 of a list, attaching a Paginator if there are more."""
+        view = Paginator(lines, title, color)
+        if view.page_count == 1:
+            await ctx.send(embed=view.build(0))
+        else:
+            await ctx.send(embed=view.build(0), view=view)
+
+    async def _fetchall(self, sql, args):
+        """Run one read query so several can be gathered.
+
+        execute_fetchall makes a single trip through aiosqlite's worker thread,
+        instead of separate ones to open, execute, fetch from and close a cursor.
+        """
+        return await self.bot.db.execute_fetchall(sql, args)
 
     # ── TASK commands ─────────────────────────────────────────────────────────
 
@@ -244,79 +432,72 @@ class Tasks(commands.Cog):
             where = "AND status != 'completed'"
             args = (ctx.author.id, ctx.guild.id)
 
-        async with self.bot.db.cursor() as cur:
-            await cur.execute(
-                f'''SELECT * FROM tasks
-                    WHERE user_id = ? AND guild_id = ?
-                    {where}
-                    ORDER BY
-                        CASE priority WHEN 'high' THEN 1 WHEN 'medium' THEN 2 ELSE 3 END,
-                        due_date ASC NULLS LAST''',
-                args,
-            )
-            rows = await cur.fetchall()
+        key = (ctx.author.id, ctx.guild.id, 'task', where)
+        lines = self._cached_lines(key)
+        if lines is None:
+            async with self.bot.db.cursor() as cur:
+                await cur.execute(
+                    f'''SELECT id, title, priority, status, due_date FROM tasks
+                        WHERE user_id = ? AND guild_id = ?
+                        {where}
+                        ORDER BY priority_rank, due_date ASC NULLS LAST''',
+                    args,
+                )
+                rows = await cur.fetchall()
 
-        lines = []
-        for r in rows:
-            p_e = PRIORITY_EMOJI.get(r['priority'], '⬜')
-            s_e = STATUS_EMOJI.get(r['status'], '⬜')
-            due = fmt_due(r['due_date'])
-            lines.append(f'{s_e} {p_e} **#{r["id"]}** {r["title"]} — {due}')
+            lines = await _format_rows(_task_lines, rows)
+            self._store_lines(key, lines)
 
         color = 0x5865F2
         title = f'📋 Your Tasks ({status})'
-        embeds = chunk_embeds(lines, title, color)
-        if len(embeds) == 1:
-            await ctx.send(embed=embeds[0])
-        else:
-            await ctx.send(embed=embeds[0], view=Paginator(embeds))
+        await self._send_paged(ctx, lines, title, color)
 
     @task.command(name='done')
     async def task_done(self, ctx, task_id: int):
         """Mark a task as complete."""
         async with self.bot.db.cursor() as cur:
+            now = datetime.now(timezone.utc)
+            now_str = now.isoformat()
             await cur.execute(
-                'SELECT * FROM tasks WHERE id = ? AND user_id = ? AND guild_id = ?',
-                (task_id, ctx.author.id, ctx.guild.id),
+                '''UPDATE tasks SET status = 'completed', completed_at = ?
+                   WHERE id = ? AND user_id = ? AND guild_id = ? AND status != 'completed'
+                   RETURNING title, due_date''',
+                (now_str, task_id, ctx.author.id, ctx.guild.id),
             )
             row = await cur.fetchone()
             if not row:
+                # Nothing updated: tell "missing" apart from "already done".
+                await cur.execute(
+                    'SELECT 1 FROM tasks WHERE id = ? AND user_id = ? AND guild_id = ?',
+                    (task_id, ctx.author.id, ctx.guild.id),
+                )
+                if await cur.fetchone():
+                    return await ctx.send(f'Task #{task_id} is already complete.')
                 return await ctx.send(f'❌ Task #{task_id} not found.')
-            if row['status'] == 'completed':
-                return await ctx.send(f'Task #{task_id} is already complete.')
 
-            now_str = datetime.now(timezone.utc).isoformat()
             on_time = 1
             if row['due_date']:
                 try:
                     due_dt = datetime.fromisoformat(row['due_date'])
                     if due_dt.tzinfo is None:
                         due_dt = due_dt.replace(tzinfo=timezone.utc)
-                    on_time = 1 if datetime.now(timezone.utc) <= due_dt else 0
+                    on_time = 1 if now <= due_dt else 0
                 except Exception:
                     on_time = 1
 
-            await cur.execute(
-                'UPDATE tasks SET status = ?, completed_at = ? WHERE id = ?',
-                ('completed', now_str, task_id),
-            )
             # Update stats
-            today = datetime.now(timezone.utc).date().isoformat()
+            today = now.date().isoformat()
             await cur.execute(
                 '''INSERT INTO task_stats (user_id, guild_id, date, tasks_completed, tasks_on_time, tasks_late)
                    VALUES (?, ?, ?, 1, ?, ?)
-                   ON CONFLICT DO NOTHING''',
-                (ctx.author.id, ctx.guild.id, today, on_time, 1 - on_time),
-            )
-            await cur.execute(
-                '''UPDATE task_stats
+                   ON CONFLICT (user_id, guild_id, date) DO UPDATE
                    SET tasks_completed = tasks_completed + 1,
-                       tasks_on_time   = tasks_on_time   + ?,
-                       tasks_late      = tasks_late      + ?
-                   WHERE user_id = ? AND guild_id = ? AND date = ?''',
-                (on_time, 1 - on_time, ctx.author.id, ctx.guild.id, today),
+                       tasks_on_time   = tasks_on_time   + excluded.tasks_on_time,
+                       tasks_late      = tasks_late      + excluded.tasks_late''',
+                (ctx.author.id, ctx.guild.id, today, on_time, 1 - on_time),
             )
         await self.bot.db.commit()
+        self.bump_version(ctx.author.id, ctx.guild.id)
 
         embed = discord.Embed(
             description=f'✅ Task **#{task_id}** – *{row["title"]}* marked complete! '
@@ -330,21 +511,25 @@ class Tasks(commands.Cog):
         """Delete a task."""
         async with self.bot.db.cursor() as cur:
             await cur.execute(
-                'SELECT title FROM tasks WHERE id = ? AND user_id = ? AND guild_id = ?',
+                'DELETE FROM tasks WHERE id = ? AND user_id = ? AND guild_id = ? RETURNING title',
                 (task_id, ctx.author.id, ctx.guild.id),
             )
             row = await cur.fetchone()
             if not row:
                 return await ctx.send(f'❌ Task #{task_id} not found.')
-            await cur.execute('DELETE FROM tasks WHERE id = ?', (task_id,))
         await self.bot.db.commit()
+        self.bump_version(ctx.author.id, ctx.guild.id)
         await ctx.send(embed=discord.Embed(description=f'🗑️ Deleted task **#{task_id}** – {row["title"]}', color=discord.Color.red()))
 
     @task.command(name='view')
     async def task_view(self, ctx, task_id: int):
         """View detailed info for a task."""
         async with self.bot.db.cursor() as cur:
-            await cur.execute('SELECT * FROM tasks WHERE id = ? AND guild_id = ?', (task_id, ctx.guild.id))
+            await cur.execute(
+                '''SELECT id, title, description, due_date, priority, status, tag, created_at, completed_at
+                   FROM tasks WHERE id = ? AND guild_id = ?''',
+                (task_id, ctx.guild.id),
+            )
             r = await cur.fetchone()
         if not r:
             return await ctx.send(f'❌ Task #{task_id} not found.')
@@ -391,80 +576,69 @@ class Tasks(commands.Cog):
     @assign.command(name='list')
     async def assign_list(self, ctx, *, course: str = None):
         """List assignments. Optionally filter by course name."""
-        if course:
+        key = (ctx.author.id, ctx.guild.id, 'assign', course)
+        lines = self._cached_lines(key)
+        if lines is None:
+            if course and self._fts and len(course) >= FTS_MIN_QUERY:
+                sql = '''SELECT a.id, a.course, a.title, a.status, a.due_date, a.points
+                         FROM assignments_fts f JOIN assignments a ON a.id = f.rowid
+                         WHERE f.course MATCH ? AND a.user_id = ? AND a.guild_id = ?
+                           AND a.status != 'completed'
+                         ORDER BY a.due_date ASC'''
+                args = ('"' + course.replace('"', '""') + '"', ctx.author.id, ctx.guild.id)
+            else:
+                like = f'%{course}%' if course else None
+                sql = '''SELECT id, course, title, status, due_date, points FROM assignments
+                         WHERE user_id = ? AND guild_id = ? AND status != 'completed'
+                           AND (? IS NULL OR course LIKE ?)
+                         ORDER BY due_date ASC'''
+                args = (ctx.author.id, ctx.guild.id, like, like)
             async with self.bot.db.cursor() as cur:
-                await cur.execute(
-                    '''SELECT * FROM assignments
-                       WHERE user_id = ? AND guild_id = ? AND course LIKE ? AND status != 'completed'
-                       ORDER BY due_date ASC''',
-                    (ctx.author.id, ctx.guild.id, f'%{course}%'),
-                )
-                rows = await cur.fetchall()
-        else:
-            async with self.bot.db.cursor() as cur:
-                await cur.execute(
-                    '''SELECT * FROM assignments
-                       WHERE user_id = ? AND guild_id = ? AND status != 'completed'
-                       ORDER BY due_date ASC''',
-                    (ctx.author.id, ctx.guild.id),
-                )
+                await cur.execute(sql, args)
                 rows = await cur.fetchall()
 
-        lines = []
-        for r in rows:
-            s_e = STATUS_EMOJI.get(r['status'], '⬜')
-            due = fmt_due(r['due_date'])
-            pts = f' [{r["points"]}pts]' if r['points'] else ''
-            lines.append(f'{s_e} **#{r["id"]}** **{r["course"]}** – {r["title"]}{pts} — {due}')
+            lines = await _format_rows(_assign_lines, rows)
+            self._store_lines(key, lines)
 
         title = f'📚 Assignments{" — " + course if course else ""}'
-        embeds = chunk_embeds(lines, title, 0xFF6B35)
-        if len(embeds) == 1:
-            await ctx.send(embed=embeds[0])
-        else:
-            await ctx.send(embed=embeds[0], view=Paginator(embeds))
+        await self._send_paged(ctx, lines, title, 0xFF6B35)
 
     @assign.command(name='done')
     async def assign_done(self, ctx, assign_id: int):
         """Mark an assignment as submitted/complete."""
         async with self.bot.db.cursor() as cur:
+            now = datetime.now(timezone.utc)
+            now_str = now.isoformat()
             await cur.execute(
-                'SELECT * FROM assignments WHERE id = ? AND user_id = ? AND guild_id = ?',
-                (assign_id, ctx.author.id, ctx.guild.id),
+                '''UPDATE assignments SET status = 'submitted', completed_at = ?
+                   WHERE id = ? AND user_id = ? AND guild_id = ?
+                   RETURNING title, due_date''',
+                (now_str, assign_id, ctx.author.id, ctx.guild.id),
             )
             row = await cur.fetchone()
             if not row:
                 return await ctx.send(f'❌ Assignment #{assign_id} not found.')
 
-            now_str = datetime.now(timezone.utc).isoformat()
             on_time = 1
             if row['due_date']:
                 try:
                     due_dt = datetime.fromisoformat(row['due_date'])
                     if due_dt.tzinfo is None:
                         due_dt = due_dt.replace(tzinfo=timezone.utc)
-                    on_time = 1 if datetime.now(timezone.utc) <= due_dt else 0
+                    on_time = 1 if now <= due_dt else 0
                 except Exception:
                     on_time = 1
 
-            await cur.execute(
-                'UPDATE assignments SET status = ?, completed_at = ? WHERE id = ?',
-                ('submitted', now_str, assign_id),
-            )
-            today = datetime.now(timezone.utc).date().isoformat()
+            today = now.date().isoformat()
             await cur.execute(
                 '''INSERT INTO task_stats (user_id, guild_id, date, assignments_completed)
                    VALUES (?, ?, ?, 1)
-                   ON CONFLICT DO NOTHING''',
-                (ctx.author.id, ctx.guild.id, today),
-            )
-            await cur.execute(
-                '''UPDATE task_stats
-                   SET assignments_completed = assignments_completed + 1
-                   WHERE user_id = ? AND guild_id = ? AND date = ?''',
+                   ON CONFLICT (user_id, guild_id, date) DO UPDATE
+                   SET assignments_completed = assignments_completed + 1''',
                 (ctx.author.id, ctx.guild.id, today),
             )
         await self.bot.db.commit()
+        self.bump_version(ctx.author.id, ctx.guild.id)
 
         embed = discord.Embed(
             description=f'📤 Assignment **#{assign_id}** – *{row["title"]}* marked submitted! '
@@ -478,14 +652,13 @@ class Tasks(commands.Cog):
         """Delete an assignment."""
         async with self.bot.db.cursor() as cur:
             await cur.execute(
-                'SELECT title FROM assignments WHERE id = ? AND user_id = ? AND guild_id = ?',
+                'DELETE FROM assignments WHERE id = ? AND user_id = ? AND guild_id = ? RETURNING id',
                 (assign_id, ctx.author.id, ctx.guild.id),
             )
-            row = await cur.fetchone()
-            if not row:
+            if not await cur.fetchone():
                 return await ctx.send(f'❌ Assignment #{assign_id} not found.')
-            await cur.execute('DELETE FROM assignments WHERE id = ?', (assign_id,))
         await self.bot.db.commit()
+        self.bump_version(ctx.author.id, ctx.guild.id)
         await ctx.send(embed=discord.Embed(description=f'🗑️ Deleted assignment **#{assign_id}**', color=discord.Color.red()))
 
     @assign.command(name='courses')
@@ -510,57 +683,63 @@ class Tasks(commands.Cog):
     @commands.command(name='today')
     async def today(self, ctx):
         """Show everything due today."""
-        today = datetime.now().date().isoformat()
-        tomorrow = (datetime.now().date() + timedelta(days=1)).isoformat()
-
-        async with self.bot.db.cursor() as cur:
-            await cur.execute(
-                '''SELECT * FROM tasks
-                   WHERE user_id = ? AND guild_id = ?
-                     AND status != 'completed'
-                     AND due_date >= ? AND due_date < ?
-                   ORDER BY priority''',
-                (ctx.author.id, ctx.guild.id, today, tomorrow),
-            )
-            tasks = await cur.fetchall()
-
-            await cur.execute(
-                '''SELECT * FROM assignments
-                   WHERE user_id = ? AND guild_id = ?
-                     AND status != 'completed' AND status != 'submitted'
-                     AND due_date >= ? AND due_date < ?
-                   ORDER BY due_date''',
-                (ctx.author.id, ctx.guild.id, today, tomorrow),
-            )
-            assigns = await cur.fetchall()
-
-            await cur.execute(
-                '''SELECT * FROM tasks
+        now = datetime.now()
+        today_ord = now.toordinal()
+
+        # One round trip for all three sections; `kind` says which one a row
+        # belongs to. Overdue tasks come before undated ones, and each of those
+        # branches is limited on its own so only ten rows reach the final sort.
+        uid, gid = ctx.author.id, ctx.guild.id
+        rows = await self._fetchall(
+            '''SELECT * FROM (
+                   SELECT 0 AS kind, id, title, priority, NULL AS course, due_date, priority AS sk
+                   FROM tasks
+                   WHERE user_id = ? AND guild_id = ? AND status != 'completed' AND due_ord = ?)
+               UNION ALL
+               SELECT * FROM (
+                   SELECT 1, id, title, NULL, course, due_date, due_date FROM assignments
                    WHERE user_id = ? AND guild_id = ?
-                     AND status != 'completed'
-                     AND (due_date IS NULL OR due_date < ?)
-                   ORDER BY due_date ASC NULLS LAST
-                   LIMIT 5''',
-                (ctx.author.id, ctx.guild.id, today),
-            )
-            overdue_tasks = await cur.fetchall()
+                     AND status NOT IN ('completed', 'submitted') AND due_ord = ?)
+               UNION ALL
+               SELECT * FROM (
+                   SELECT 2, id, title, NULL, NULL, due_date, due_ord FROM tasks
+                   WHERE user_id = ? AND guild_id = ? AND status != 'completed' AND due_ord < ?
+                   ORDER BY due_ord LIMIT 5)
+               UNION ALL
+               SELECT * FROM (
+                   SELECT 3, id, title, NULL, NULL, due_date, NULL FROM tasks
+                   WHERE user_id = ? AND guild_id = ? AND status != 'completed' AND due_date IS NULL
+                   LIMIT 5)
+               ORDER BY kind, sk''',
+            (uid, gid, today_ord, uid, gid, today_ord, uid, gid, today_ord, uid, gid),
+        )
+        tasks, assigns, overdue_tasks = [], [], []
+        sections = (tasks, assigns, overdue_tasks, overdue_tasks)
+        for r in rows:
+            sections[r['kind']].append(r)
+        del overdue_tasks[5:]
 
         embed = discord.Embed(
-            title=f'📅 Today — {datetime.now().strftime("%A, %B %d")}',
+            title=f'📅 Today — {now.strftime("%A, %B %d")}',
             color=0x5865F2,
         )
 
         if tasks:
-            lines = [f'{PRIORITY_EMOJI.get(r["priority"], "⬜")} **#{r["id"]}** {r["title"]}' for r in tasks]
-            embed.add_field(name=f'📋 Tasks Due Today ({len(tasks)})', value='\n'.join(lines), inline=False)
+            pe = PRIORITY_EMOJI.get
+            embed.add_field(name=f'📋 Tasks Due Today ({len(tasks)})',
+                            value='\n'.join(f'{pe(r["priority"], "⬜")} **#{r["id"]}** {r["title"]}' for r in tasks),
+                            inline=False)
 
         if assigns:
-            lines = [f'📖 **{r["course"]}** – {r["title"]}' for r in assigns]
-            embed.add_field(name=f'📚 Assignments Due Today ({len(assigns)})', value='\n'.join(lines), inline=False)
+            embed.add_field(name=f'📚 Assignments Due Today ({len(assigns)})',
+                            value='\n'.join(f'📖 **{r["course"]}** – {r["title"]}' for r in assigns),
+                            inline=False)
 
         if overdue_tasks:
-            lines = [f'🔴 **#{r["id"]}** {r["title"]} — {fmt_due(r["due_date"])}' for r in overdue_tasks]
-            embed.add_field(name='⚠️ Overdue Tasks', value='\n'.join(lines), inline=False)
+            embed.add_field(name='⚠️ Overdue Tasks',
+                            value='\n'.join(f'🔴 **#{r["id"]}** {r["title"]} — {fmt_due(r["due_date"], today_ord)}'
+                                             for r in overdue_tasks),
+                            inline=False)
 
         if not tasks and not assigns and not overdue_tasks:
             embed.description = '🎉 Nothing due today!'
@@ -571,44 +750,47 @@ class Tasks(commands.Cog):
     async def week(self, ctx):
         """Show everything due this week."""
         today = datetime.now().date()
-        end_of_week = (today + timedelta(days=7)).isoformat()
-        today_str = today.isoformat()
+        week_end = today + timedelta(days=7)
+        today_ord = today.toordinal()
 
-        async with self.bot.db.cursor() as cur:
-            await cur.execute(
-                '''SELECT * FROM tasks
+        uid, gid = ctx.author.id, ctx.guild.id
+        tasks, assigns = await asyncio.gather(
+            self._fetchall(
+                '''SELECT id, title, priority, due_date FROM tasks
                    WHERE user_id = ? AND guild_id = ?
                      AND status != 'completed'
-                     AND due_date >= ? AND due_date <= ?
+                     AND due_ord BETWEEN ? AND ?
                    ORDER BY due_date ASC''',
-                (ctx.author.id, ctx.guild.id, today_str, end_of_week),
-            )
-            tasks = await cur.fetchall()
-
-            await cur.execute(
-                '''SELECT * FROM assignments
+                (uid, gid, today_ord, today_ord + 7),
+            ),
+            self._fetchall(
+                '''SELECT course, title, due_date FROM assignments
                    WHERE user_id = ? AND guild_id = ?
                      AND status NOT IN ('completed', 'submitted')
-                     AND due_date >= ? AND due_date <= ?
+                     AND due_ord BETWEEN ? AND ?
                    ORDER BY due_date ASC''',
-                (ctx.author.id, ctx.guild.id, today_str, end_of_week),
-            )
-            assigns = await cur.fetchall()
+                (uid, gid, today_ord, today_ord + 7),
+            ),
+        )
 
         embed = discord.Embed(
-            title=f'📅 This Week — {today.strftime("%b %d")} to {(today + timedelta(days=7)).strftime("%b %d")}',
+            title=f'📅 This Week — {today.strftime("%b %d")} to {week_end.strftime("%b %d")}',
             color=0x5865F2,
         )
 
         if tasks:
-            lines = [f'{PRIORITY_EMOJI.get(r["priority"], "⬜")} **#{r["id"]}** {r["title"]} — {fmt_due(r["due_date"])}'
-                     for r in tasks]
-            embed.add_field(name=f'📋 Tasks ({len(tasks)})', value='\n'.join(lines[:15]), inline=False)
+            pe = PRIORITY_EMOJI.get
+            # Only the first 15 rows are shown, so only those are formatted.
+            embed.add_field(name=f'📋 Tasks ({len(tasks)})',
+                            value='\n'.join(f'{pe(r["priority"], "⬜")} **#{r["id"]}** {r["title"]} — '
+                                             f'{fmt_due(r["due_date"], today_ord)}' for r in tasks[:15]),
+                            inline=False)
 
         if assigns:
-            lines = [f'📖 **{r["course"]}** – {r["title"]} — {fmt_due(r["due_date"])}'
-                     for r in assigns]
-            embed.add_field(name=f'📚 Assignments ({len(assigns)})', value='\n'.join(lines[:15]), inline=False)
+            embed.add_field(name=f'📚 Assignments ({len(assigns)})',
+                            value='\n'.join(f'📖 **{r["course"]}** – {r["title"]} — {fmt_due(r["due_date"], today_ord)}'
+                                             for r in assigns[:15]),
+                            inline=False)
 
         if not tasks and not assigns:
             embed.description = '🎉 Nothing due this week!'
@@ -3,112 +3,147 @@ import re
 import io
 import asyncio
 import datetime
+import heapq
+import logging
+from collections import OrderedDict, deque
+from functools import lru_cache
 from PIL import Image
 import discord
 from discord.ext import commands
 
+log = logging.getLogger(__name__)
+
+_HEX_RE = re.compile(r'^#(?:[0-9a-fA-F]{3}){1,2}$')
+
+# Channels remembered by !snipe; the least recently deleted-in are dropped first.
+SNIPE_CACHE_SIZE = 5000
+# Deleted messages kept per channel; each !snipe takes the newest one left.
+SNIPE_DEPTH = 5
+# Ordinary user messages; joins, pins and other system messages are skipped.
+_SNIPE_TYPES = (discord.MessageType.default, discord.MessageType.reply)
+
+# (name, value) for each `!help` section, in display order.
+_HELP_FIELDS: tuple[tuple[str, str], ...] = (
+    ('⚙️ Setup', '`!setup` · `!setup view` · `!setup location` · `!setup timezone` · `!setup time`'),
+    ('📋 Tasks', '`!task add/list/done/delete/view` · `!today` · `!week`'),
+    ('📚 Assignments', '`!assign add/list/done/delete/courses`'),
+    ('⏰ Reminders', '`!remind <time> to <message>` · `!reminders` · `!reminders delete <id>`'),
+    ('🏷️ Tags', '`!tag <name>` · `!tag create/edit/delete/list/info/raw/search/transfer`'),
+    ('📅 Calendar', '`!calendar setup/code/today/week/next/status/unlink`'),
+    ('🎓 Canvas', '`!canvas setup/courses/assignments/grades/sync/status/unlink`'),
+    ('📧 Email', '`!email setup/check/sleep/status/unlink`'),
+    ('🌤️ Weather', '`!weather [city]` · `!forecast [city]`'),
+    ('📊 Stats', '`!stats` · `!stats week` · `!stats month` · `!leaderboard`'),
+    ('💰 Economy', '`!balance` · `!daily` · `!work` · `!coinflip` · `!slots` · `!roll` · `!give` · `!rob`'),
+    ('⚡ Levels', '`!rank` · `!top`'),
+    ('💀 Graveyard', '`!death` · `!revive` · `!obit`'),
+    ('🎮 Minecraft', '`!status` · `!join` · `!leave`'),
+    ('🔧 Utility', '`!ping` · `!whois` · `!color` · `!snipe` · `!echo` · `!schedule`'),
+)
+
+
+def _build_help_embed() -> discord.Embed:
+    """The static `!help` reference; built once when the cog loads."""
+    return discord.Embed.from_dict({
+        'title': 'Iron Bot — Command Reference',
+        'description': 'Prefix: `!` · `-` · `?`',
+        'color': 0x5865F2,
+        'fields': [{'name': n, 'value': v, 'inline': False} for n, v in _HELP_FIELDS],
+        'footer': {'text': 'Use !setup to configure channels, timezone, and connected services.'},
+    })
+
+
+@lru_cache(maxsize=256)
+def _png_for_hex(hexcode: str) -> bytes:
+    """Encoded 200×200 PNG swatch for a normalised `#rrggbb` / `#rgb` code."""
+    buf = io.BytesIO()
+    Image.new('RGB', (200, 200), hexcode).save(buf, 'PNG')
+    return buf.getvalue()
+
 
 class Utils(commands.Cog):
     """General utility and moderation tools."""
 
     def __init__(self, bot):
         self.bot = bot
-        self._snipe: dict[int, tuple] = {}  # channel_id → (content, author, timestamp)
+        # channel_id → deque of (content, author_id, author_name, avatar_url,
+        # timestamp), newest first. Plain values only, so cached
+        # entries don't keep Member objects alive.
+        self._snipe: OrderedDict[int, deque[tuple]] = OrderedDict()
+        self._help_embed = _build_help_embed()
+        # One background task sends every !schedule message: a heap of
+        # (send_at timestamp, row id, channel_id, message) ordered by deadline,
+        # and an event to wake it when an earlier message is added.
+        self._sched_heap: list[tuple[float, int, int, str]] = []
+        self._sched_wake = asyncio.Event()
+        self._sched_task: asyncio.Task | None = None
+
+    async def cog_load(self):
+        async with self.bot.db.cursor() as cur:
+            await cur.execute('SELECT send_at, id, channel_id, message FROM scheduled_messages')
+            self._sched_heap = [tuple(r) for r in await cur.fetchall()]
+        heapq.heapify(self._sched_heap)
+        self._sched_task = asyncio.create_task(self._scheduler())
+
+    async def cog_unload(self):
+        if self._sched_task is not None:
+            self._sched_task.cancel()
+
+    async def _scheduler(self):
+        await self.bot.wait_until_ready()
+        while True:
+            self._sched_wake.clear()
+            delay = None
+            if self._sched_heap:
+                delay = self._sched_heap[0][0] - datetime.datetime.now().timestamp()
+            if delay is None or delay > 0:
+                try:
+                    await asyncio.wait_for(self._sched_wake.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            _, sched_id, channel_id, message = heapq.heappop(self._sched_heap)
+            channel = self.bot.get_channel(channel_id)
+            try:
+                if channel:
+                    await channel.send(message)
+            except Exception as exc:
+                log.warning('Failed to send scheduled message %s: %s', sched_id, exc)
+            async with self.bot.db.cursor() as cur:
+                await cur.execute('DELETE FROM scheduled_messages WHERE id = ?', (sched_id,))
+            await self.bot.db.commit()
 
     # ── Events ────────────────────────────────────────────────────────────────
 
     @commands.Cog.listener()
     async def on_message_delete(self, message: discord.Message):
-        if message.guild and message.content:
-            self._snipe[message.channel.id] = (message.content, message.author, message.created_at)
+        if not message.guild or not message.content:
+            return
+        # Bot output, system messages and deleted command invocations are never
+        # what anyone wants to snipe, so keep them out of the cache.
+        if message.author.bot or message.type not in _SNIPE_TYPES:
+            return
+        prefixes = await self.bot.get_prefix(message)
+        if message.content.startswith(tuple(prefixes) if isinstance(prefixes, list) else prefixes):
+            return
+        author = message.author
+        recent = self._snipe.get(message.channel.id)
+        if recent is None:
+            recent = self._snipe[message.channel.id] = deque(maxlen=SNIPE_DEPTH)
+        recent.appendleft((
+            message.content, author.id, str(author), author.display_avatar.url, message.created_at,
+        ))
+        self._snipe.move_to_end(message.channel.id)
+        if len(self._snipe) > SNIPE_CACHE_SIZE:
+            self._snipe.popitem(last=False)
 
     # ── Commands ──────────────────────────────────────────────────────────────
 
     @commands.command(name='help')
     async def help(self, ctx):
         """Show all available commands."""
-        embed = discord.Embed(
-            title='Iron Bot — Command Reference',
-            description='Prefix: `!` · `-` · `?`',
-            color=0x5865F2,
-        )
-        embed.add_field(
-            name='⚙️ Setup',
-            value='`!setup` · `!setup view` · `!setup location` · `!setup timezone` · `!setup time`',
-            inline=False,
-        )
-        embed.add_field(
-            name='📋 Tasks',
-            value='`!task add/list/done/delete/view` · `!today` · `!week`',
-            inline=False,
-        )
-        embed.add_field(
-            name='📚 Assignments',
-            value='`!assign add/list/done/delete/courses`',
-            inline=False,
-        )
-        embed.add_field(
-            name='⏰ Reminders',
-            value='`!remind <time> to <message>` · `!reminders` · `!reminders delete <id>`',
-            inline=False,
-        )
-        embed.add_field(
-            name='🏷️ Tags',
-            value='`!tag <name>` · `!tag create/edit/delete/list/info/raw/search/transfer`',
-            inline=False,
-        )
-        embed.add_field(
-            name='📅 Calendar',
-            value='`!calendar setup/code/today/week/next/status/unlink`',
-            inline=False,
-        )
-        embed.add_field(
-            name='🎓 Canvas',
-            value='`!canvas setup/courses/assignments/grades/sync/status/unlink`',
-            inline=False,
-        )
-        embed.add_field(
-            name='📧 Email',
-            value='`!email setup/check/sleep/status/unlink`',
-            inline=False,
-        )
-        embed.add_field(
-            name='🌤️ Weather',
-            value='`!weather [city]` · `!forecast [city]`',
-            inline=False,
-        )
-        embed.add_field(
-            name='📊 Stats',
-            value='`!stats` · `!stats week` · `!stats month` · `!leaderboard`',
-            inline=False,
-        )
-        embed.add_field(
-            name='💰 Economy',
-            value='`!balance` · `!daily` · `!work` · `!coinflip` · `!slots` · `!roll` · `!give` · `!rob`',
-            inline=False,
-        )
-        embed.add_field(
-            name='⚡ Levels',
-            value='`!rank` · `!top`',
-            inline=False,
-        )
-        embed.add_field(
-            name='💀 Graveyard',
-            value='`!death` · `!revive` · `!obit`',
-            inline=False,
-        )
-        embed.add_field(
-            name='🎮 Minecraft',
-            value='`!status` · `!join` · `!leave`',
-            inline=False,
-        )
-        embed.add_field(
-            name='🔧 Utility',
-            value='`!ping` · `!whois` · `!color` · `!snipe` · `!echo` · `!schedule`',
-            inline=False,
-        )
-        embed.set_footer(text='Use !setup to configure channels, timezone, and connected services.')
-        await ctx.send(embed=embed)
+        await ctx.send(embed=self._help_embed)
 
     @commands.command(name='ping')
     async def ping(self, ctx):
@@ -123,27 +158,23 @@ class Utils(commands.Cog):
     @commands.command(name='echo')
     async def echo(self, ctx, *, message: str):
         """Echo a message and delete the original."""
-        try:
-            await ctx.message.delete()
-        except Exception:
-            pass
+        # With a delay discord.py deletes in a background task and ignores
+        # failures, so the echo isn't held up by the delete round trip.
+        await ctx.message.delete(delay=0)
         await ctx.send(message)
 
     @commands.command(name='color', aliases=['colour'])
     async def color(self, ctx, hexcode: str):
         """Show a colour swatch. Example: `!color #5865F2`"""
-        if not re.match(r'^#(?:[0-9a-fA-F]{3}){1,2}$', hexcode):
+        if not _HEX_RE.match(hexcode):
             return await ctx.send('❌ Invalid hex code. Example: `#5865F2`')
-        img = Image.new('RGB', (200, 200), hexcode)
-        buf = io.BytesIO()
-        img.save(buf, 'PNG')
-        buf.seek(0)
+        hexcode = hexcode.lower()
         embed = discord.Embed(
             description=f'Colour: `{hexcode}`',
             color=int(hexcode.replace('#', '0x'), 16),
         )
         embed.set_thumbnail(url='attachment://color.png')
-        await ctx.send(file=discord.File(buf, 'color.png'), embed=embed)
+        await ctx.send(file=discord.File(io.BytesIO(_png_for_hex(hexcode)), 'color.png'), embed=embed)
 
     @commands.command(name='whois', aliases=['userinfo', 'uinfo', 'who'])
     async def whois(self, ctx, user: discord.Member = None):
@@ -156,21 +187,24 @@ class Utils(commands.Cog):
         embed.add_field(name='Account Created', value=user.created_at.strftime('%Y-%m-%d'), inline=True)
         embed.add_field(name='Joined Server', value=user.joined_at.strftime('%Y-%m-%d'), inline=True)
         embed.add_field(name='Top Role', value=user.top_role.mention, inline=True)
-        roles = [r.mention for r in user.roles if r.name != '@everyone']
-        embed.add_field(name=f'Roles ({len(roles)})', value=' '.join(roles[:10]) or 'None', inline=False)
+        # Only the first 10 roles are shown, so only those get mentions built.
+        visible = [r for r in user.roles if r.name != '@everyone']
+        shown = ' '.join(f'<@&{r.id}>' for r in visible[:10])
+        embed.add_field(name=f'Roles ({len(visible)})', value=shown or 'None', inline=False)
         embed.set_footer(text=f'Requested by {ctx.author}')
         await ctx.send(embed=embed)
 
     @commands.command(name='snipe')
     async def snipe(self, ctx):
         """Retrieve the last deleted message in this channel."""
-        data = self._snipe.get(ctx.channel.id)
-        if not data:
+        recent = self._snipe.get(ctx.channel.id)
+        if not recent:
             return await ctx.send('No recently deleted messages to snipe.')
-        content, author, ts = data
-        del self._snipe[ctx.channel.id]
+        content, _, author_name, avatar_url, ts = recent.popleft()
+        if not recent:
+            del self._snipe[ctx.channel.id]
         embed = discord.Embed(description=content, color=discord.Color.purple(), timestamp=ts)
-        embed.set_author(name=str(author), icon_url=author.display_avatar.url)
+        embed.set_author(name=author_name, icon_url=avatar_url)
         embed.set_footer(text=f'Sniped by {ctx.author}')
         await ctx.send(embed=embed)
 
@@ -188,16 +222,16 @@ class Utils(commands.Cog):
         now = datetime.datetime.now()
         if dt <= now:
             return await ctx.send('❌ Cannot schedule messages in the past.')
-        delay = (dt - now).total_seconds()
-
-        async def _send():
-            await asyncio.sleep(delay)
-            try:
-                await channel.send(message)
-            except Exception:
-                pass
-
-        asyncio.create_task(_send())
+        send_at = dt.timestamp()
+        async with self.bot.db.cursor() as cur:
+            await cur.execute(
+                'INSERT INTO scheduled_messages (channel_id, send_at, message) VALUES (?, ?, ?)',
+                (channel.id, send_at, message),
+            )
+            sched_id = cur.lastrowid
+        await self.bot.db.commit()
+        heapq.heappush(self._sched_heap, (send_at, sched_id, channel.id, message))
+        self._sched_wake.set()
         embed = discord.Embed(
             description=f'⏰ Scheduled to {channel.mention} at `{dt.strftime("%Y-%m-%d %H:%M")}`',
             color=discord.Color.blue(),
@@ -10,14 +10,26 @@ Commands
 import discord
 from discord.ext import commands
 import aiohttp
+import asyncio
+import orjson
 import os
 import logging
-from datetime import datetime
+import time
+from collections import Counter
+from datetime import date, datetime
 
 log = logging.getLogger(__name__)
 
 BASE = 'https://api.openweathermap.org/data/2.5'
 
+# How long a guild's default weather location is cached, in seconds.
+LOCATION_TTL = 300
+# How long OpenWeatherMap responses are reused per location, in seconds.
+CURRENT_TTL = 600
+FORECAST_TTL = 3600
+# Past this many cached responses, expired ones are dropped on the next store.
+WX_CACHE_SIZE = 256
+
 CONDITION_EMOJI = {
     'clear':          '☀️',
     'clouds':         '☁️',
@@ -41,8 +53,17 @@ def _weather_emoji(condition: str) -> str:
     return CONDITION_EMOJI.get(condition.lower(), '🌡️')
 
 
+_F_PER_C = 9 / 5
+# date.toordinal() of the Unix epoch, for turning UTC day numbers into dates.
+_EPOCH_ORD = date(1970, 1, 1).toordinal()
+
+
 def _c_to_f(c: float) -> float:
-    return round(c * 9 / 5 + 32, 1)
+    return round(c * _F_PER_C + 32, 1)
+
+
+def _f_to_c(f: float) -> float:
+    return round((f - 32) / _F_PER_C, 1)
 
 
 def _wind_dir(deg: int) -> str:
@@ -55,7 +76,7 @@ async def _fetch_current(session, location: str, api_key: str) -> dict | None:
     async with session.get(f'{BASE}/weather', params=params) as r:
         if r.status != 200:
             return None
-        return await r.json()
+        return await r.json(loads=orjson.loads)
 
 
 async def _fetch_forecast(session, location: str, api_key: str) -> dict | None:
@@ -63,16 +84,15 @@ async def _fetch_forecast(session, location: str, api_key: str) -> dict | None:
     async with session.get(f'{BASE}/forecast', params=params) as r:
         if r.status != 200:
             return None
-        return await r.json()
+        return await r.json(loads=orjson.loads)
 
 
-def _build_current_embed(data: dict) -> discord.Embed:
+def _build_current_embed(data: dict, now: datetime) -> discord.Embed:
     city     = data['name']
     country  = data['sys']['country']
     cond     = data['weather'][0]['main']
     desc     = data['weather'][0]['description'].title()
     temp_f   = data['main']['temp']
-    temp_c   = _c_to_f.__doc__ and round((temp_f - 32) * 5 / 9, 1)
     feels_f  = data['main']['feels_like']
     humidity = data['main']['humidity']
     wind_spd = data['wind']['speed']
@@ -80,24 +100,22 @@ def _build_current_embed(data: dict) -> discord.Embed:
     vis      = data.get('visibility', 0)
     emoji    = _weather_emoji(cond)
 
-    temp_c_val = round((temp_f - 32) * 5 / 9, 1)
-
     embed = discord.Embed(
         title=f'{emoji} {city}, {country}',
         description=f'**{desc}**',
         color=_condition_color(cond),
-        timestamp=datetime.utcnow(),
+        timestamp=now,
     )
-    embed.add_field(name='🌡️ Temperature', value=f'{temp_f}°F / {temp_c_val}°C', inline=True)
-    embed.add_field(name='🤔 Feels Like', value=f'{feels_f}°F / {round((feels_f-32)*5/9,1)}°C', inline=True)
+    embed.add_field(name='🌡️ Temperature', value=f'{temp_f}°F / {_f_to_c(temp_f)}°C', inline=True)
+    embed.add_field(name='🤔 Feels Like', value=f'{feels_f}°F / {_f_to_c(feels_f)}°C', inline=True)
     embed.add_field(name='💧 Humidity', value=f'{humidity}%', inline=True)
     embed.add_field(name='💨 Wind', value=f'{wind_spd} mph {_wind_dir(wind_deg)}', inline=True)
     embed.add_field(name='👁️ Visibility', value=f'{vis // 1000 if vis else "?"} km', inline=True)
     if 'rain' in data:
         embed.add_field(name='🌧️ Rain (1h)', value=f'{data["rain"].get("1h", 0)} mm', inline=True)
 
-    sunrise = datetime.utcfromtimestamp(data['sys']['sunrise']).strftime('%H:%M UTC')
-    sunset  = datetime.utcfromtimestamp(data['sys']['sunset']).strftime('%H:%M UTC')
+    sunrise = time.strftime('%H:%M UTC', time.gmtime(data['sys']['sunrise']))
+    sunset  = time.strftime('%H:%M UTC', time.gmtime(data['sys']['sunset']))
     embed.add_field(name='🌅 Sunrise / Sunset', value=f'{sunrise} / {sunset}', inline=False)
     embed.set_footer(text='OpenWeatherMap • !forecast for 5-day outlook')
     return embed
@@ -115,38 +133,37 @@ def _condition_color(cond: str) -> discord.Color:
     return mapping.get(cond.lower(), discord.Color.blurple())
 
 
-def _build_forecast_embed(data: dict, location: str) -> discord.Embed:
+def _build_forecast_embed(data: dict, location: str, now: datetime) -> discord.Embed:
     """Build a 5-day daily summary embed from 3-hr forecast data."""
-    # Group by date
-    days: dict[str, list] = {}
+    # One pass over the 3-hourly items, keeping running figures per UTC day
+    # number; the day's date is built once, from its first item.
+    days: dict[int, list] = {}  # day -> [date, high, low, max pop, Counter of conditions]
     for item in data['list']:
-        dt = datetime.utcfromtimestamp(item['dt'])
-        date_key = dt.strftime('%Y-%m-%d')
-        days.setdefault(date_key, []).append(item)
+        day_no = item['dt'] // 86400
+        temp = item['main']['temp']
+        pop = item.get('pop', 0)
+        acc = days.get(day_no)
+        if acc is None:
+            if len(days) == 5:
+                break
+            acc = days[day_no] = [date.fromordinal(_EPOCH_ORD + day_no), temp, temp, pop, Counter()]
+        else:
+            acc[1] = max(acc[1], temp)
+            acc[2] = min(acc[2], temp)
+            acc[3] = max(acc[3], pop)
+        acc[4][item['weather'][0]['main']] += 1
 
     embed = discord.Embed(
         title=f'📅 5-Day Forecast — {location.title()}',
         color=0x87CEEB,
-        timestamp=datetime.utcnow(),
+        timestamp=now,
     )
 
-    for date_key in list(days.keys())[:5]:
-        items = days[date_key]
-        temps = [i['main']['temp'] for i in items]
-        conds = [i['weather'][0]['main'] for i in items]
-        pop   = max(i.get('pop', 0) for i in items) * 100
-
-        high = max(temps)
-        low  = min(temps)
-        most_common = max(set(conds), key=conds.count)
-        emoji = _weather_emoji(most_common)
-
-        dt = datetime.strptime(date_key, '%Y-%m-%d')
-        day_label = dt.strftime('%a %b %d')
-
+    for day, high, low, pop, conds in days.values():
+        emoji = _weather_emoji(conds.most_common(1)[0][0])
         embed.add_field(
-            name=f'{emoji} {day_label}',
-            value=f'⬆️ {high}°F  ⬇️ {low}°F\n🌧️ Precip: {int(pop)}%',
+            name=f'{emoji} {day.strftime("%a %b %d")}',
+            value=f'⬆️ {high}°F  ⬇️ {low}°F\n🌧️ Precip: {int(pop * 100)}%',
             inline=True,
         )
 
@@ -164,20 +181,69 @@ class Weather(commands.Cog):
         self.api_key = os.getenv('OPENWEATHER_API_KEY')
         if not self.api_key:
             log.warning('OPENWEATHER_API_KEY not set – weather commands will not work.')
+        # guild_id -> (weather_location or None, monotonic time it was read)
+        self._loc_cache: dict[int, tuple[str | None, float]] = {}
+        # (endpoint, lowercased location) -> (expiry as monotonic time, response JSON)
+        self._wx_cache: dict[tuple[str, str], tuple[float, dict]] = {}
+        self._session: aiohttp.ClientSession | None = None
+        # Fetches currently in flight, by the same key as _wx_cache, so that
+        # concurrent requests for one location share a single HTTP call.
+        self._inflight: dict[tuple[str, str], asyncio.Task] = {}
+
+    async def cog_load(self):
+        # One long-lived session so the connection to OpenWeatherMap is kept
+        # alive and reused instead of re-handshaking on every command.
+        self._session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=16, ttl_dns_cache=300),
+            headers={'User-Agent': 'iron-bot'},
+        )
+
+    async def cog_unload(self):
+        if self._session is not None:
+            await self._session.close()
+
+    def invalidate(self, guild_id: int):
+        """Forget a guild's cached default location after it has been changed."""
+        self._loc_cache.pop(guild_id, None)
+
+    async def _get(self, endpoint: str, fetch, ttl: float, location: str) -> dict | None:
+        """Fetch from OpenWeatherMap, reusing a response for `ttl` seconds."""
+        key = (endpoint, location.lower())
+        now = time.monotonic()
+        hit = self._wx_cache.get(key)
+        if hit and now < hit[0]:
+            return hit[1]
+        task = self._inflight.get(key)
+        if task is not None:
+            return await asyncio.shield(task)
+        task = self._inflight[key] = asyncio.create_task(fetch(self._session, location, self.api_key))
+        try:
+            data = await asyncio.shield(task)
+        finally:
+            self._inflight.pop(key, None)
+        now = time.monotonic()
+        if data is not None:
+            if len(self._wx_cache) >= WX_CACHE_SIZE:
+                self._wx_cache = {k: v for k, v in self._wx_cache.items() if now < v[0]}
+            self._wx_cache[key] = (now + ttl, data)
+        return data
 
     async def _resolve_location(self, ctx, location: str | None) -> str | None:
         """Use provided location, or fall back to guild config."""
         if location:
             return location
-        async with self.bot.db.cursor() as cur:
+        hit = self._loc_cache.get(ctx.guild.id)
+        if hit and time.monotonic() - hit[1] < LOCATION_TTL:
+            return hit[0]
+        async with self.bot.reader() as db, db.cursor() as cur:
             await cur.execute(
                 'SELECT weather_location FROM guild_config WHERE guild_id = ?',
                 (ctx.guild.id,),
             )
             row = await cur.fetchone()
-        if row and row['weather_location']:
-            return row['weather_location']
-        return None
+        loc = row['weather_location'] if row and row['weather_location'] else None
+        self._loc_cache[ctx.guild.id] = (loc, time.monotonic())
+        return loc
 
     @commands.command(name='weather', aliases=['w'])
     async def weather(self, ctx, *, location: str = None):
@@ -195,13 +261,12 @@ class Weather(commands.Cog):
             return await ctx.send('❌ No location set. Provide one or run `!setup location <city>`.')
 
         async with ctx.typing():
-            async with aiohttp.ClientSession() as session:
-                data = await _fetch_current(session, loc, self.api_key)
+            data = await self._get('weather', _fetch_current, CURRENT_TTL, loc)
 
         if not data:
             return await ctx.send(f'❌ Could not find weather for `{loc}`.')
 
-        await ctx.send(embed=_build_current_embed(data))
+        await ctx.send(embed=_build_current_embed(data, datetime.utcnow()))
 
     @commands.command(name='forecast', aliases=['fc'])
     async def forecast(self, ctx, *, location: str = None):
@@ -219,13 +284,12 @@ class Weather(commands.Cog):
             return await ctx.send('❌ No location set. Provide one or run `!setup location <city>`.')
 
         async with ctx.typing():
-            async with aiohttp.ClientSession() as session:
-                data = await _fetch_forecast(session, loc, self.api_key)
+            data = await self._get('forecast', _fetch_forecast, FORECAST_TTL, loc)
 
         if not data:
             return await ctx.send(f'❌ Could not find forecast for `{loc}`.')
 
-        await ctx.send(embed=_build_forecast_embed(data, loc))
+        await ctx.send(embed=_build_forecast_embed(data, loc, datetime.utcnow()))
 
 
 async def setup(bot):